@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import string
+from random import Random
+
 from tools.runner import PuzzleRunner
 
 
@@ -20,6 +23,25 @@ class Day3(PuzzleRunner):
                 CrZsJsPPZsGzwwsLwLmpwMDw
                 """
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        for _ in range(size):
+            badge = rng.choice(string.ascii_letters)
+            others = [item for item in string.ascii_letters if item != badge]
+            rng.shuffle(others)
+
+            # each elf draws from its own third of the items, so only the badge is shared
+            for pool in (others[0::3], others[1::3], others[2::3]):
+                shared, left_pool, right_pool = pool[0], pool[1::2], pool[2::2]
+                half = rng.randint(4, 16)
+                left = rng.choices(left_pool, k=half - 1) + [shared]
+                right = rng.choices(right_pool, k=half - 2) + [shared, badge]
+                rng.shuffle(left)
+                rng.shuffle(right)
+                lines.append("".join(left + right))
+
+        return "\n".join(lines)
+
     def puzzle_one(self, data) -> int:
         priority = 0
 
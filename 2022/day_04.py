@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from random import Random
+
 from tools.runner import PuzzleRunner
 
 
@@ -21,6 +23,15 @@ class Day4(PuzzleRunner):
 6-6,4-6
 2-6,4-8"""
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        for _ in range(size):
+            a, b = sorted(rng.randint(1, 99) for _ in range(2))
+            c, d = sorted(rng.randint(1, 99) for _ in range(2))
+            lines.append(f"{a}-{b},{c}-{d}")
+
+        return "\n".join(lines)
+
     def puzzle_one(self, data: list[str]) -> int:
         result = 0
         for line in data:
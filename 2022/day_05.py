@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import string
+from random import Random
+
 from tools.runner import PuzzleRunner
 
 
@@ -14,6 +17,29 @@ move 3 from 1 to 3
 move 2 from 2 to 1
 move 1 from 1 to 2"""
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        heights = [rng.randint(3, 8) for _ in range(9)]
+        rows = [
+            " ".join(
+                f"[{rng.choice(string.ascii_uppercase)}]" if height > row else "   "
+                for height in heights
+            ).rstrip()
+            for row in reversed(range(max(heights)))
+        ]
+        rows.append(" ".join(f" {i} " for i in range(1, 10)).rstrip())
+        rows.append("")
+
+        for _ in range(size):
+            # never empty a stack, the answer reads the top of every one
+            source = rng.choice([i for i, height in enumerate(heights) if height > 1])
+            target = rng.choice([i for i in range(9) if i != source])
+            count = rng.randint(1, heights[source] - 1)
+            heights[source] -= count
+            heights[target] += count
+            rows.append(f"move {count} from {source + 1} to {target + 1}")
+
+        return "\n".join(rows)
+
     def puzzle_one(self, data: list[str]) -> int:
         stacks = {}
         pos_lookup = {}
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import string
+from random import Random
+
 from tools.runner import PuzzleRunner
 
 
@@ -10,6 +13,11 @@ nppdvjthqldpwncqszvftbrmjlhg
 nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg
 zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw"""
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        # too few letters for a marker until the very end
+        signal = rng.choices("abc", k=size)
+        return "".join(signal) + "".join(rng.sample(string.ascii_lowercase, 14))
+
     def puzzle_one(self, data: list[str]) -> int:
         seen = set([])
         pos = []
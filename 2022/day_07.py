@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from random import Random
+
 from tools import str_to_ints
 from tools.runner import PuzzleRunner
 
@@ -112,6 +114,29 @@ $ ls
 
         return root
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        children = {0: []}
+        for i in range(1, size):
+            children[rng.randrange(i)].append(i)
+            children[i] = []
+
+        lines = ["$ cd /"]
+
+        def walk(directory: int) -> None:
+            lines.append("$ ls")
+            for child in children[directory]:
+                lines.append(f"dir d{child}")
+            for i in range(rng.randint(1, 5)):
+                lines.append(f"{rng.randint(1_000, 300_000)} f{i}.txt")
+
+            for child in children[directory]:
+                lines.append(f"$ cd d{child}")
+                walk(child)
+                lines.append("$ cd ..")
+
+        walk(0)
+        return "\n".join(lines)
+
     def puzzle_one(self, data: list[str]) -> int:
         root = self.populate_nodes(data)
 
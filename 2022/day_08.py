@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
-from tools import ORTHO_DIRS
+from random import Random
+
+from tools.grid import Grid, GridView
 from tools.runner import PuzzleRunner
+from tools.utils import PuzzleInput
 
 
 class Day8(PuzzleRunner):
+    SCALE_SIZES = (25, 50, 100, 200)
+
     def get_example_str(self) -> str:
         return """30373
 25512
@@ -11,108 +16,51 @@ class Day8(PuzzleRunner):
 33549
 35390"""
 
-    def puzzle_one(self, data: list[str]) -> int:
-        grid = []
-        for line in data:
-            cols = [int(c) for c in line]
-            grid.append(cols)
+    def parse(self, data: PuzzleInput) -> Grid:
+        # the digit bytes sort like the heights they stand for
+        return Grid.from_lines(data)
+
+    def generate_input(self, size: int, rng: Random) -> str:
+        return "\n".join(
+            "".join(rng.choices("0123456789", k=size)) for _ in range(size)
+        )
+
+    def sight_lines(self, grid: Grid) -> list[GridView]:
+        """Views of the grid whose rows run along each of the four directions"""
+        view = grid.view()
+        transposed = view.transposed()
+        return [view, view.reversed(), transposed, transposed.reversed()]
+
+    def puzzle_one(self, data: PuzzleInput) -> int:
+        grid = data.parsed
 
         visible = set([])
-        max_cols = [-1] * len(grid[0])
-        for r, row in enumerate(grid):
-            max_row_val = -1
-            for c, tree in enumerate(row):
-                if r == 0 or r == len(grid) - 1 or c == 0 or c == len(row) - 1:
-                    visible.add((r, c))
-
-                if tree > max_row_val:
-                    visible.add((r, c))
-                    max_row_val = tree
-
-                if tree > max_cols[c]:
-                    visible.add((r, c))
-                    max_cols[c] = tree
-
-        max_cols = [-1] * len(grid[0])
-        for r in range(len(grid) - 1, -1, -1):
-            row = grid[r]
-            max_row_val = -1
-            for c in range(len(row) - 1, -1, -1):
-                tree = row[c]
-                if r == 0 or r == len(grid) - 1 or c == 0 or c == len(row) - 1:
-                    visible.add((r, c))
-
-                if tree > max_row_val:
-                    visible.add((r, c))
-                    max_row_val = tree
-
-                if tree > max_cols[c]:
-                    visible.add((r, c))
-                    max_cols[c] = tree
+        for view in self.sight_lines(grid):
+            for y, row in enumerate(view.rows()):
+                tallest = -1
+                for tree, index in zip(row, view.row_indices(y)):
+                    if tree > tallest:
+                        visible.add(index)
+                        tallest = tree
 
         return len(visible)
 
-    def puzzle_two(self, data: list[str]) -> int:
-        grid = []
-        for line in data:
-            cols = [int(c) for c in line]
-            grid.append(cols)
+    def puzzle_two(self, data: PuzzleInput) -> int:
+        grid = data.parsed
 
-        visible = set([])
-        max_cols = [-1] * len(grid[0])
-        for r, row in enumerate(grid):
-            max_row_val = -1
-            for c, tree in enumerate(row):
-                if r == 0 or r == len(grid) - 1 or c == 0 or c == len(row) - 1:
-                    visible.add((r, c))
-
-                if tree > max_row_val:
-                    visible.add((r, c))
-                    max_row_val = tree
-
-                if tree > max_cols[c]:
-                    visible.add((r, c))
-                    max_cols[c] = tree
-
-        max_cols = [-1] * len(grid[0])
-        for r in range(len(grid) - 1, -1, -1):
-            row = grid[r]
-            max_row_val = -1
-            for c in range(len(row) - 1, -1, -1):
-                tree = row[c]
-                if r == 0 or r == len(grid) - 1 or c == 0 or c == len(row) - 1:
-                    visible.add((r, c))
-
-                if tree > max_row_val:
-                    visible.add((r, c))
-                    max_row_val = tree
-
-                if tree > max_cols[c]:
-                    visible.add((r, c))
-                    max_cols[c] = tree
-
-        max_view = -1
-        for tree in visible:
-            view = 1
-            for dir in ORTHO_DIRS:
-                distance = 0
-                x = tree[0]
-                y = tree[1]
-                while 0 <= x + dir[0] < len(grid) and 0 <= y + dir[1] < len(grid[0]):
-                    distance += 1
-
-                    if grid[x + dir[0]][y + dir[1]] >= grid[tree[0]][tree[1]]:
-                        break
-
-                    x = x + dir[0]
-                    y = y + dir[1]
-
-                view *= distance
-
-            if view > max_view:
-                max_view = view
-
-        return max_view
+        scores = [1] * len(grid)
+        for view in self.sight_lines(grid):
+            for y, row in enumerate(view.rows()):
+                # trees behind the current one that could still block the view
+                blockers = []
+                for x, (tree, index) in enumerate(zip(row, view.row_indices(y))):
+                    while blockers and row[blockers[-1]] < tree:
+                        blockers.pop()
+
+                    scores[index] *= x - (blockers[-1] if blockers else 0)
+                    blockers.append(x)
+
+        return max(scores)
 
 
 Day8()
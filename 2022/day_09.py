@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from math import pow, sqrt
+from random import Random
 
 from tools import DOWN, LEFT, RIGHT, UP
 from tools.runner import PuzzleRunner
@@ -26,6 +27,11 @@ D 10
 L 25
 U 20"""
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        return "\n".join(
+            f"{rng.choice('RLUD')} {rng.randint(1, 20)}" for _ in range(size)
+        )
+
     def puzzle_one(self, data: list[str]) -> int:
         head_pos = prev_head = (0, 0)
         tail_pos = (0, 0)
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from random import Random
+
 from tools import *
 from tools.alg import *
 from tools.runner import *
@@ -29,6 +31,21 @@ class Day10(PuzzleRunner):
     def puzzle_one_example_solution(self) -> Any:
         return 13140
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        x = 1
+        # the crt draws 240 cycles, which takes at least 240 instructions
+        for _ in range(max(size, 240)):
+            if rng.random() < 0.5:
+                lines.append("noop")
+                continue
+
+            value = rng.randint(max(-10, -x), min(10, 39 - x))
+            x += value
+            lines.append(f"addx {value}")
+
+        return "\n".join(lines)
+
     def puzzle_one(self, data: list[str]) -> int:
         cycles = get_cycles(data)
         return sum([cycles[i - 1] * i for i in range(20, len(cycles), 40)])
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from dataclasses import dataclass
+from random import Random
 
 from tools import *
 from tools.alg import *
@@ -49,9 +50,43 @@ class Operation:
 
 
 class Day11(PuzzleRunner):
+    SCALE_SIZES = (4, 8, 16, 32)
+
     def puzzle_one_example_solution(self) -> Any:
         return 10605
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        size = max(size, 2)
+
+        primes = []
+        candidate = 2
+        while len(primes) < size:
+            if all(candidate % prime for prime in primes):
+                primes.append(candidate)
+            candidate += 1
+        rng.shuffle(primes)
+
+        lines = []
+        for i, prime in enumerate(primes):
+            items = [rng.randint(50, 99) for _ in range(rng.randint(1, 8))]
+            # no "old * old", part one never takes a modulo so squared worries explode
+            operation = rng.choice(
+                [f"old * {rng.randint(2, 19)}", f"old + {rng.randint(1, 8)}"]
+            )
+            others = [j for j in range(size) if j != i]
+            true_target, false_target = rng.choice(others), rng.choice(others)
+            lines += [
+                f"Monkey {i}:",
+                f"  Starting items: {', '.join(map(str, items))}",
+                f"  Operation: new = {operation}",
+                f"  Test: divisible by {prime}",
+                f"    If true: throw to monkey {true_target}",
+                f"    If false: throw to monkey {false_target}",
+                "",
+            ]
+
+        return "\n".join(lines)
+
     def puzzle_one(self, data: list[str]) -> int:
         monkeys = []
         curr_monkey = None
@@ -1,96 +1,88 @@
 # -*- coding: utf-8 -*-
+from random import Random
+
 from tools import *
 from tools.alg import *
+from tools.grid import Grid
+from tools.kernels import any_neighbour, occupancy
 from tools.runner import PuzzleRunner
+from tools.utils import PuzzleInput
 
 
 class Day12(PuzzleRunner):
+    SCALE_SIZES = (32, 64, 128, 256)
+
     def puzzle_one_example_solution(self) -> Any:
         return 31
 
-    def dijkstra(self, start, end, grid, rows, cols):
-        cost = {}
-        queue = [(start, 0)]
-        cost[start] = 0
-
-        while len(queue) > 0:
-            node, steps = queue.pop(0)
-            # print(node, cost)
-            if cost[node] != steps:
-                continue
-
-            node_iord = iord(grid[node.y][node.x])
-            next_steps = steps + 1
-
-            for neighbor in ORTHO_DIRS:
-                child = node + neighbor
-
-                # ignore if outside grid
-                if child.x < 0 or child.x >= cols or child.y < 0 or child.y >= rows:
-                    continue
-
-                # ignore if step is too large
-                if iord(grid[child.y][child.x]) - node_iord > 1:
+    def climb_steps(self, grid: Grid, starts: str) -> int:
+        """Fewest steps from any of the `starts` letters up to E, growing the set of
+        cells that can reach E one step at a time with whole-grid kernels"""
+        targets = occupancy(grid, starts)
+        reached = frontier = occupancy(grid, "E")
+
+        grid = grid.copy()
+        grid[grid.find("S")], grid[grid.find("E")] = "a", "z"
+        levels = [occupancy(grid, ichr(height)) for height in range(26)]
+        at_least = levels[:]
+        for height in range(24, -1, -1):
+            at_least[height] = at_least[height] | at_least[height + 1]
+
+        steps = 0
+        while frontier.any():
+            if (frontier & targets).any():
+                return steps
+
+            climbers = None
+            for height, level in enumerate(levels):
+                layer = frontier & level
+                if not layer.any():
                     continue
 
-                if child not in cost or next_steps < cost[child]:
-                    cost[child] = next_steps
-                    if child != end:
-                        queue.append((child, next_steps))
-
-            queue = sorted(queue, key=lambda x: x[1])
-
-        try:
-            return cost[end]
-        except KeyError:
-            return float("inf")
-
-    def puzzle_one(self, data: list[str]) -> int:
-        grid, rows, cols = data_to_grid(data)
-
-        start = end = None
-        # Find Start and End
-        for y in range(rows):
-            for x in range(cols):
-                if grid[y][x] == "S":
-                    start = Point(x, y)
-                    grid[y][x] = "a"
-                elif grid[y][x] == "E":
-                    end = Point(x, y)
-                    grid[y][x] = "z"
-
-            if start != None and end != None:
-                break
-
-        return self.dijkstra(start, end, grid, rows, cols)
+                # neighbours at most one lower can step up onto this layer
+                step_up = (
+                    any_neighbour(layer, ORTHO_DIRS) & at_least[max(height - 1, 0)]
+                )
+                climbers = step_up if climbers is None else climbers | step_up
+
+            frontier = climbers & ~reached
+            reached = reached | frontier
+            steps += 1
+
+        return float("inf")
+
+    def generate_input(self, size: int, rng: Random) -> str:
+        # a to z needs 25 steps up, so the rows are at least 26 wide
+        width, height = max(size, 26), max(size, 1)
+        rows = []
+        for _ in range(height):
+            # every row climbs left to right one letter at a time, at random
+            # columns, so it reaches the summit while the rows around it don't
+            # line up and the search still has to go round the walls between them
+            climbs = set(rng.sample(range(1, width), 25))
+            row, letter = [], 0
+            for x in range(width):
+                letter += x in climbs
+                row.append(ichr(letter))
+            rows.append(row)
+
+        rows[height // 2][0] = "S"
+        rows[height // 2][-1] = "E"
+        lines = ["".join(row) for row in rows]
+
+        if self.climb_steps(Grid.from_lines(lines), "S") == float("inf"):
+            raise ValueError(f"Generated a {width}x{height} grid without a route to E")
+
+        return "\n".join(lines)
+
+    def puzzle_one(self, data: PuzzleInput) -> int:
+        return self.climb_steps(data.grid, "S")
 
     def puzzle_two_example_solution(self) -> Any:
         return 29
 
-    def puzzle_two(self, data: list[str]) -> int:
-        grid, rows, cols = data_to_grid(data)
-
-        end = None
-        starts = []
-        for y in range(rows):
-            for x in range(cols):
-                if grid[y][x] == "S":
-                    start = Point(x, y)
-                    starts.append(start)
-                    grid[y][x] = "a"
-                elif grid[y][x] == "E":
-                    end = Point(x, y)
-                    grid[y][x] = "z"
-                elif grid[y][x] == "a":
-                    starts.append(Point(x, y))
-
-        smallest_path = float("inf")
-
-        for start in starts:
-            cost = self.dijkstra(start, end, grid, rows, cols)
-            smallest_path = min(smallest_path, cost)
-
-        return smallest_path
+    def puzzle_two(self, data: PuzzleInput) -> int:
+        return self.climb_steps(data.grid, "Sa")
 
 
 Day12()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import json
+from random import Random
 
 from tools import *
 from tools.alg import *
@@ -34,6 +35,21 @@ class Day13(PuzzleRunner):
 
         return cmp(len(left), len(right))
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        def packet(depth: int) -> list:
+            return [
+                packet(depth + 1)
+                if depth < 3 and rng.random() < 0.3
+                else rng.randint(0, 10)
+                for _ in range(rng.randint(0, 5))
+            ]
+
+        pairs = [
+            "\n".join(json.dumps(packet(0), separators=(",", ":")) for _ in range(2))
+            for _ in range(size)
+        ]
+        return "\n\n".join(pairs)
+
     def puzzle_one(self, data: list[str]) -> int:
         packets = self.extract_packets(data)
         correct_sum = 0
@@ -1,112 +1,102 @@
 # -*- coding: utf-8 -*-
+from random import Random
+
 from tools import *
 from tools.alg import *
+from tools.grid import Grid
 from tools.runner import PuzzleRunner
 
+AIR, ROCK, SAND = b".#o"
+SAND_SOURCE = (500, 0)
 
-class Day14(PuzzleRunner):
-    def draw_grid(self, rocks: set[Point], sands: set[Point]) -> None:
-        minmax_x_rocks = minmax([rock.x for rock in rocks])
-        minmax_y_rocks = minmax([rock.y for rock in rocks])
-        minmax_x_sand = minmax([sand.x for sand in sands])
-        minmax_y_sand = minmax([sand.y for sand in sands])
-
-        min_x, max_x = min(minmax_x_rocks[0], minmax_x_sand[0]), max(
-            minmax_x_rocks[1], minmax_x_sand[1]
-        )
-        min_y, max_y = min(minmax_y_rocks[0], minmax_y_sand[0]), max(
-            minmax_y_rocks[1], minmax_y_sand[1]
-        )
-
-        for y in range(min_y, max_y + 1):
-            row = ""
-            for x in range(min_x, max_x + 1):
-                if Point(x, y) in sands:
-                    row += "o"
-                elif Point(x, y) in rocks:
-                    row += "#"
-                else:
-                    row += "."
-            print(row)
 
-        input("next")
-
-    def extract_rock_paths(self, data: list[str]) -> set[Point]:
-        def str_to_point(string: str) -> Point:
-            ints = str_to_ints(string)
-            return Point(ints[0], ints[1])
+class Day14(PuzzleRunner):
+    SCALE_SIZES = (10, 20, 40, 80)
 
+    def extract_rock_paths(self, data: list[str]) -> set[Tuple[int, int]]:
         rocks = set([])
         for line in data:
-            point_split = line.split(" -> ")
-            points = [str_to_point(split) for split in point_split]
-            curr_point = points[0]
-            rocks.add(curr_point)
+            points = [tuple(str_to_ints(split)) for split in line.split(" -> ")]
+            x, y = points[0]
+            rocks.add((x, y))
 
-            for dest_point in points[1:]:
-                direction = (dest_point - curr_point).normalise()
+            for dest_x, dest_y in points[1:]:
+                step_x, step_y = cmp(dest_x, x), cmp(dest_y, y)
 
-                while curr_point != dest_point:
-                    curr_point = curr_point + direction
-                    rocks.add(curr_point)
+                while (x, y) != (dest_x, dest_y):
+                    x, y = x + step_x, y + step_y
+                    rocks.add((x, y))
 
         return rocks
 
-    def get_sand_locs(
-        self,
-        rocks: set[Point],
-        min_x: int,
-        max_x: int,
-        max_y: int,
-        floor=Point(0, float("inf")),
-    ) -> set[Point]:
-        sands = set([])
-        sand_source = Point(500, 0)
-        curr_sand = sand_source
-        while (
-            min_x < curr_sand.x < max_x
-            and curr_sand.y < max_y
-            and sand_source not in rocks
-        ):
-            next_sand = curr_sand + DOWN
-
-            if next_sand in rocks:
-                dl = curr_sand + DOWN_LEFT
-                dr = curr_sand + DOWN_RIGHT
-
-                if dl not in rocks:
-                    next_sand = dl
-                elif dr not in rocks:
-                    next_sand = dr
-
-            if next_sand in rocks or next_sand.y >= floor.y:
-                sands.add(curr_sand)
-                rocks.add(curr_sand)
-                curr_sand = sand_source
+    def build_cave(self, rocks: set[Tuple[int, int]]) -> Tuple[Grid, int, int]:
+        max_y = max(y for _, y in rocks)
+        floor = max_y + 2
+
+        # sand spreads at most one column per row, so it never passes the floor's ends
+        min_x = min(min(x for x, _ in rocks), SAND_SOURCE[0] - floor) - 1
+        max_x = max(max(x for x, _ in rocks), SAND_SOURCE[0] + floor) + 1
+
+        cave = Grid(max_x - min_x + 1, floor + 1, fill=AIR)
+        for x, y in rocks:
+            cave[x - min_x, y] = ROCK
+        for x in range(cave.width):
+            cave[x, floor] = ROCK
+
+        return cave, cave.index(SAND_SOURCE[0] - min_x, SAND_SOURCE[1]), max_y
+
+    def pour_sand(self, cave: Grid, source: int, abyss: int) -> int:
+        """Number of grains that settle before one falls past row `abyss` or the
+        source is buried"""
+        falls = [offset for _, _, offset in cave.offsets((DOWN, DOWN_LEFT, DOWN_RIGHT))]
+        cells = cave.cells
+        abyss_start = cave.index(0, abyss + 1)
+
+        sands = 0
+        while cells[source] == AIR:
+            grain = source
+            while grain < abyss_start:
+                for fall in falls:
+                    if cells[grain + fall] == AIR:
+                        grain += fall
+                        break
+                else:
+                    cells[grain] = SAND
+                    sands += 1
+                    break
             else:
-                curr_sand = next_sand
+                return sands
 
         return sands
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        for _ in range(size):
+            x, y = rng.randint(500 - size, 500 + size), rng.randint(2, 2 + size)
+            path = [f"{x},{y}"]
+            # alternate horizontal and vertical segments
+            for i in range(rng.randint(1, 3)):
+                if i % 2 == 0:
+                    x += rng.choice([-1, 1]) * rng.randint(1, 6)
+                else:
+                    y = max(2, y + rng.choice([-1, 1]) * rng.randint(1, 6))
+                path.append(f"{x},{y}")
+            lines.append(" -> ".join(path))
+
+        return "\n".join(lines)
+
     def puzzle_one(self, data: list[str]) -> int:
-        rocks = self.extract_rock_paths(data)
-        min_x, max_x = minmax([point.x for point in rocks])
-        min_y, max_y = minmax([point.y for point in rocks])
+        cave, source, max_y = self.build_cave(self.extract_rock_paths(data))
 
-        return len(self.get_sand_locs(rocks, min_x, max_x, max_y))
+        return self.pour_sand(cave, source, max_y)
 
     def puzzle_one_example_solution(self) -> Any:
         return 24
 
     def puzzle_two(self, data: list[str]) -> int:
-        rocks = self.extract_rock_paths(data)
-        min_y, max_y = minmax([point.y for point in rocks])
-
-        return len(
-            self.get_sand_locs(
-                rocks, float("-inf"), float("inf"), max_y + 2, floor=Point(0, max_y + 2)
-            )
-        )
+        cave, source, max_y = self.build_cave(self.extract_rock_paths(data))
+
+        return self.pour_sand(cave, source, cave.height)
 
     def puzzle_two_example_solution(self) -> Any:
         return 93
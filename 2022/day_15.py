@@ -1,25 +1,27 @@
 # -*- coding: utf-8 -*-
+from random import Random
 from typing import Set
 
-from tools import ALL_DIRS, Any, List, Tuple, str_to_ints
+from tools import ALL_DIRS, Any, List, Tuple
 from tools.math import Circle, Point
 from tools.runner import PuzzleRunner
+from tools.utils import PuzzleInput
 
 
 class Day15(PuzzleRunner):
+    SCALE_SIZES = (5, 10, 20, 40)
+
     def get_sensors_beacons_min_max(
-        self, data: list[str]
+        self, data: PuzzleInput
     ) -> Tuple[List[Circle], Set[Point], int, int]:
         min_x, max_x = float("inf"), float("-inf")
         sensors = []
         beacons = set([])
-        for line in data:
-            line_split = line.split(":")
-            sensor_vals = str_to_ints(line_split[0])
-            beacon_vals = str_to_ints(line_split[1])
+        for row in data.int_table(width=4):
+            sensor_x, sensor_y, beacon_x, beacon_y = row.tolist()
 
-            sensor_point = Point(sensor_vals[0], sensor_vals[1])
-            beacon_point = Point(beacon_vals[0], beacon_vals[1])
+            sensor_point = Point(sensor_x, sensor_y)
+            beacon_point = Point(beacon_x, beacon_y)
             sensor = Circle.from_two_points(sensor_point, beacon_point)
 
             sensors.append(sensor)
@@ -30,6 +32,9 @@ class Day15(PuzzleRunner):
 
         return sensors, beacons, min_x, max_x
 
+    def parse(self, data: PuzzleInput) -> Tuple[List[Circle], Set[Point], int, int]:
+        return self.get_sensors_beacons_min_max(data)
+
     def get_coverage(
         self,
         row: int,
@@ -46,13 +51,27 @@ class Day15(PuzzleRunner):
         coverage = list(filter(lambda p: any([s.contains(p) for s in sensors]), points))
         return coverage
 
-    def puzzle_one(self, data: list[str]) -> int:
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        for _ in range(size):
+            sensor_x, sensor_y = rng.randint(0, 4_000_000), rng.randint(0, 4_000_000)
+            radius = rng.randint(10_000, 1_000_000)
+            offset = rng.randint(-radius, radius)
+            beacon_x = sensor_x + offset
+            beacon_y = sensor_y + rng.choice([-1, 1]) * (radius - abs(offset))
+            lines.append(
+                f"Sensor at x={sensor_x}, y={sensor_y}: closest beacon is at x={beacon_x}, y={beacon_y}"
+            )
+
+        return "\n".join(lines)
+
+    def puzzle_one(self, data: PuzzleInput) -> int:
         if self.is_test:
             row = 10
         else:
             row = 2000000
 
-        sensors, beacons, min_x, max_x = self.get_sensors_beacons_min_max(data)
+        sensors, beacons, min_x, max_x = data.parsed
         coverage = self.get_coverage(row, sensors, beacons, min_x, max_x)
         coverage = list(
             filter(
@@ -67,13 +86,13 @@ class Day15(PuzzleRunner):
     def puzzle_one_example_solution(self) -> Any:
         return 26
 
-    def puzzle_two(self, data: list[str]) -> int:
+    def puzzle_two(self, data: PuzzleInput) -> int:
         if self.is_test:
             bounds = (0, 20)
         else:
             bounds = (0, 4000000)
 
-        sensors, beacons, min_x, max_x = self.get_sensors_beacons_min_max(data)
+        sensors, beacons, min_x, max_x = data.parsed
         seen_points = set([])
         for sensor in sensors:
             for dx in range(sensor.radius + 1):
@@ -1,20 +1,22 @@
 # -*- coding: utf-8 -*-
 import re
 from collections import defaultdict
+from random import Random
+from string import ascii_uppercase
 from typing import Set
 
-from tools import Any, ImmutableList, Tuple, arr_to_key, str_to_ints, subsets
+from tools import Any, Tuple, complement_pairs, max_over_submasks, str_to_ints
 from tools.alg import Node
 from tools.runner import PuzzleRunner
+from tools.store import disk_memoize
+from tools.utils import PuzzleInput
 
 OPEN_TIME = 1
 
 
-def nodes_to_names(arr: list[Node]) -> list[str]:
-    return [node.name for node in arr]
-
-
 class Day16(PuzzleRunner):
+    SCALE_SIZES = (4, 6, 8, 10)
+
     def generate_node_graph(self, data: list[str]) -> Tuple[Node, set]:
         pass
 
@@ -42,67 +44,111 @@ class Day16(PuzzleRunner):
 
         return valve_info_dict["AA"]["node"], valves
 
-    def maximize_release(self, start: Node, valves: Set[Node], time_limit=30) -> dict:
-        target_valves = list(filter(lambda v: v.value > 0, valves))
-
-        stack = [[ImmutableList([start]), 0, {}]]
-        path_pressures = defaultdict(lambda: 0)
-
+    def parse(self, data: PuzzleInput) -> Tuple[Node, set]:
+        return self.generate_node_graph(data)
+
+    @disk_memoize(key=lambda self, valves: sorted(valve.name for valve in valves))
+    def valve_distances(self, valves: list[Node]) -> dict[Tuple[str, str], int]:
+        """Travel time between every pair of `valves`"""
+        return {
+            (start.name, end.name): len(Node.BFS(start, end)) - 1
+            for start in valves
+            for end in valves
+        }
+
+    def maximize_release(
+        self, start: Node, valves: Set[Node], time_limit=30
+    ) -> list[int]:
+        """Most pressure released by opening exactly the valves of each mask, bit
+        `i` standing for the `i`th working valve"""
+        target_valves = sorted(
+            filter(lambda v: v.value > 0, valves), key=lambda v: v.name
+        )
+        distances = self.valve_distances([start] + target_valves)
+        # minutes to walk to and open each target, row 0 from the start, row i + 1 from target i
+        open_times = [
+            [distances[curr.name, target.name] + OPEN_TIME for target in target_valves]
+            for curr in [start] + target_valves
+        ]
+
+        pressures = [0] * (1 << len(target_valves))
+        stack = [(0, 0, 0, 0)]
         while len(stack):
-            path, minutes_elapesed, opened_valves = stack.pop()
-            curr_node = path[-1]
-
-            if minutes_elapesed >= time_limit or len(path) == len(target_valves) + 1:
-                pressure = 0
-
-                for valve, time_opened in opened_valves.items():
-                    minutes = max(time_limit - time_opened, 0)
-                    pressure += valve.value * minutes
+            position, minutes_elapsed, opened, pressure = stack.pop()
+            pressures[opened] = max(pressures[opened], pressure)
+
+            for i, next_valve in enumerate(target_valves):
+                elapsed_time = minutes_elapsed + open_times[position][i]
+                if opened >> i & 1 or elapsed_time >= time_limit:
+                    continue
+
+                stack.append(
+                    (
+                        i + 1,
+                        elapsed_time,
+                        opened | 1 << i,
+                        pressure + next_valve.value * (time_limit - elapsed_time),
+                    )
+                )
 
-                path_pressures[arr_to_key(nodes_to_names(path))] = max(
-                    path_pressures[arr_to_key(nodes_to_names(path))], pressure
+        return pressures
+
+    def generate_input(self, size: int, rng: Random) -> str:
+        names = ["AA"] + rng.sample(
+            [a + b for a in ascii_uppercase for b in ascii_uppercase if a + b != "AA"],
+            max(size, 2) - 1,
+        )
+
+        tunnels = defaultdict(set)
+        # a random spanning tree keeps every valve reachable, plus a few shortcuts
+        for i, name in enumerate(names[1:], 1):
+            other = names[rng.randrange(i)]
+            tunnels[name].add(other)
+            tunnels[other].add(name)
+        for _ in range(len(names) // 3):
+            a, b = rng.sample(names, 2)
+            tunnels[a].add(b)
+            tunnels[b].add(a)
+
+        working = set(rng.sample(names[1:], (len(names) + 1) // 2))
+
+        lines = []
+        for name in names:
+            rate = rng.randint(1, 25) if name in working else 0
+            others = sorted(tunnels[name])
+            if len(others) == 1:
+                lines.append(
+                    f"Valve {name} has flow rate={rate}; tunnel leads to valve {others[0]}"
                 )
             else:
-                for next_node in target_valves:
-                    if next_node not in opened_valves.keys():
-                        travel_time = len(Node.BFS(curr_node, next_node)) - 1
-
-                        elapsed_time = minutes_elapesed + travel_time + OPEN_TIME
-
-                        next_open_valves = opened_valves.copy()
-                        next_open_valves[next_node] = elapsed_time
-
-                        stack.append(
-                            [path.append(next_node), elapsed_time, next_open_valves]
-                        )
+                lines.append(
+                    f"Valve {name} has flow rate={rate}; tunnels lead to valves {', '.join(others)}"
+                )
 
-        return path_pressures
+        return "\n".join(lines)
 
-    def puzzle_one(self, data: list[str]) -> int:
-        root, nodes = self.generate_node_graph(data)
+    def puzzle_one(self, data: PuzzleInput) -> int:
+        root, nodes = data.parsed
         path_pressures = self.maximize_release(root, nodes)
 
-        return max(path_pressures.values())
+        return max(path_pressures)
 
     def puzzle_one_example_solution(self) -> Any:
         return 1651
 
-    def puzzle_two(self, data: list[str]) -> int:
-        root, nodes = self.generate_node_graph(data)
+    def puzzle_two(self, data: PuzzleInput) -> int:
+        root, nodes = data.parsed
         path_pressures = self.maximize_release(root, nodes, time_limit=26)
 
-        target_valves = list(filter(lambda v: v.value > 0, nodes))
-
-        max_pressure = 0
-        for subset in subsets(list(target_valves), 2):
-            my_pressure = path_pressures[arr_to_key(nodes_to_names([root] + subset[0]))]
-            elephant_pressure = path_pressures[
-                arr_to_key(nodes_to_names([root] + subset[1]))
-            ]
-
-            max_pressure = max(max_pressure, my_pressure + elephant_pressure)
+        # best pressure from any valves within each mask, so a worker given a
+        # set of valves doesn't have to open every one of them
+        best_within = max_over_submasks(path_pressures)
+        all_valves = len(path_pressures) - 1
 
-        return max_pressure
+        return max(
+            best_within[mine] + best_within[elephants]
+            for mine, elephants in complement_pairs(all_valves)
+        )
 
     def puzzle_two_example_solution(self) -> Any:
         return 1707
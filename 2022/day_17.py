@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from itertools import cycle
+from random import Random
 
 from tools import DOWN, LEFT, RIGHT, UP, Any, Point, Tuple
 from tools.math import ComplexShape, Shape, Square
@@ -31,6 +32,8 @@ jet_to_dir = {"<": LEFT, ">": RIGHT}
 
 
 class Day17(PuzzleRunner):
+    SCALE_SIZES = (10, 100, 1000, 10000)
+
     @staticmethod
     def move_shape(shape: Shape, chamber: Square, direction: Point):
         new_shape = shape + direction
@@ -135,8 +138,11 @@ class Day17(PuzzleRunner):
 
         chamber.height += height_delta
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        return "".join(rng.choices("<>", k=size))
+
     def puzzle_one(self, data: list[str]) -> int:
-        jets = cycle(enumerate(next(data)))
+        jets = cycle(enumerate(data[0]))
         chamber = self.get_chamber()
 
         self.get_fallen_rocks(jets, chamber, 2022)
@@ -148,7 +154,7 @@ class Day17(PuzzleRunner):
 
     def puzzle_two(self, data: list[str]) -> int:
 
-        jets = cycle(enumerate(next(data)))
+        jets = cycle(enumerate(data[0]))
         chamber = self.get_chamber()
 
         self.get_fallen_rocks(jets, chamber, 1000000000000)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from random import Random
 from typing import Set, Tuple
 
 from tools import ORTHO_DIRS, Any, minmax
@@ -9,6 +10,8 @@ ORTHO_3D = ORTHO_DIRS + (Point(0, 0, 1), Point(0, 0, -1))
 
 
 class Day18(PuzzleRunner):
+    SCALE_SIZES = (250, 500, 1000, 2000)
+
     def get_example_str(self) -> str:
         return """2,2,2
 1,2,2
@@ -45,6 +48,15 @@ class Day18(PuzzleRunner):
             closed_areas,
         )
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        # about a third of a cube with room for `size` droplets
+        side = max(2, round((3 * size) ** (1 / 3)))
+        cubes = set()
+        while len(cubes) < min(size, side**3):
+            cubes.add(tuple(rng.randrange(side) for _ in range(3)))
+
+        return "\n".join(f"{x},{y},{z}" for x, y, z in cubes)
+
     def puzzle_one(self, data: list[str]) -> int:
         exposed, _ = self.get_exposed_sides(data)
         return len(exposed)
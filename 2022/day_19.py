@@ -3,11 +3,19 @@ import math
 from collections import defaultdict, deque
 from copy import deepcopy
 from enum import IntEnum
+from random import Random
 from typing import Set
 
-from tools import Any, Iterable, dict_to_str, str_to_ints
+from tools import Any, Iterable, dict_to_str
 from tools.runner import PuzzleRunner
-from tools.utils import memoize
+from tools.store import disk_memoize
+from tools.utils import PuzzleInput, memoize
+
+# Factories are changed in place by fast_forward and build, so their caches are
+# keyed by a snapshot of the state, and bounded as they'd otherwise keep every
+# searched state alive. get_fastest_robot_build also keys on the factory's
+# identity, as callers go on to change the factories it returns.
+MEMO_MAXSIZE = 100_000
 
 
 class Materials(IntEnum):
@@ -87,13 +95,25 @@ class Factory:
             )
         )
 
+    def snapshot(self) -> tuple:
+        """Immutable copy of the state, the robot costs follow from the blueprint"""
+        return (
+            self.blueprint_id,
+            self.remaining_time,
+            tuple(self.stockpile.get(material, 0) for material in Materials),
+            tuple(self.robots[material]["count"] for material in Materials),
+        )
+
     def __str__(self) -> str:
         return f"Factory({self.blueprint_id=}, {self.remaining_time=}, {self.stockpile=}, {self.robots=})"
 
     def __repr__(self) -> str:
         return str(self)
 
-    @memoize
+    @memoize(
+        maxsize=MEMO_MAXSIZE,
+        key=lambda self, robot_name: (self.snapshot(), robot_name),
+    )
     def time_to_build(self, robot_name: Materials) -> int:
         robot = self.robots[robot_name]
         if any(self.robots[material]["count"] == 0 for material in robot["cost_mat"]):
@@ -164,7 +184,15 @@ class Factory:
         )
 
     @staticmethod
-    @memoize
+    @memoize(
+        maxsize=MEMO_MAXSIZE,
+        key=lambda factory, material, allow_multiple=False: (
+            id(factory),
+            factory.snapshot(),
+            material,
+            allow_multiple,
+        ),
+    )
     def get_fastest_robot_build(
         factory: "Factory", material: Materials, allow_multiple=False
     ) -> list["Factory"]:
@@ -251,7 +279,7 @@ class Factory:
         return fastest_nodes
 
     @staticmethod
-    @memoize
+    @memoize(maxsize=MEMO_MAXSIZE, key=lambda factory: factory.snapshot())
     def get_greedy_build(factory: "Factory") -> "Factory":
         if factory.remaining_time <= 0:
             return factory
@@ -277,20 +305,29 @@ class Factory:
 
 
 class Day19(PuzzleRunner):
+    SCALE_SIZES = (1, 2, 4)
+
     def get_example_str(self) -> str:
         return """Blueprint 1: Each or robot costs 4 or. Each clay robot costs 2 or. Each obsidian robot costs 3 or and 14 clay. Each geode robot costs 2 or and 7 obsidian.
 Blueprint 2: Each or robot costs 2 or. Each clay robot costs 3 or. Each obsidian robot costs 3 or and 8 clay. Each geode robot costs 3 or and 12 obsidian."""
 
-    def factory_generator(self, data: list[str], time) -> Iterable[Factory]:
-        for line in data:
-            blueprint_split = line.split(":")
-            blueprint_id = str_to_ints(blueprint_split[0])[0]
-            robots_split = blueprint_split[1].split(".")
-
-            ore_robot_cost = str_to_ints(robots_split[0])
-            clay_robot_cost = str_to_ints(robots_split[1])
-            obsidian_robot_cost = str_to_ints(robots_split[2])
-            geode_robot_cost = str_to_ints(robots_split[3])
+    def factory_generator(self, data: PuzzleInput, time) -> Iterable[Factory]:
+        # id, ore robot ore, clay robot ore, obsidian robot ore and clay, geode robot ore and obsidian
+        for row in data.int_table(width=7):
+            (
+                blueprint_id,
+                ore,
+                clay,
+                obsidian_ore,
+                obsidian_clay,
+                geode_ore,
+                geode_obsidian,
+            ) = row.tolist()
+
+            ore_robot_cost = [ore]
+            clay_robot_cost = [clay]
+            obsidian_robot_cost = [obsidian_ore, obsidian_clay]
+            geode_robot_cost = [geode_ore, geode_obsidian]
 
             yield Factory(
                 blueprint_id=blueprint_id,
@@ -340,12 +377,31 @@ Blueprint 2: Each or robot costs 2 or. Each clay robot costs 3 or. Each obsidian
         print(f"{len(visited)=}")
         return completed
 
+    def generate_input(self, size: int, rng: Random) -> str:
+        lines = []
+        for i in range(1, size + 1):
+            lines.append(
+                f"Blueprint {i}: "
+                f"Each ore robot costs {rng.randint(2, 4)} ore. "
+                f"Each clay robot costs {rng.randint(2, 4)} ore. "
+                f"Each obsidian robot costs {rng.randint(2, 4)} ore and {rng.randint(5, 20)} clay. "
+                f"Each geode robot costs {rng.randint(2, 4)} ore and {rng.randint(5, 20)} obsidian."
+            )
+
+        return "\n".join(lines)
+
+    @disk_memoize(
+        key=lambda self, factory: (factory.blueprint_id, factory.remaining_time)
+    )
+    def max_geodes(self, factory: Factory) -> int:
+        return max(
+            [f.stockpile[Materials.GEODE] for f in self.process_factory(factory)]
+        )
+
     def puzzle_one(self, data: list[str]) -> int:
         geodes = []
         for factory in self.factory_generator(data, 24):
-            max_geode = max(
-                [f.stockpile[Materials.GEODE] for f in self.process_factory(factory)]
-            )
+            max_geode = self.max_geodes(factory)
             geodes.append(max_geode * factory.blueprint_id)
             print(f"{factory.blueprint_id=}: {max_geode}")
 
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+from tools.batch import ROOT_DIR, run_day
+
+DAY_19 = os.path.join(ROOT_DIR, "2022", "day_19.py")
+
+
+def test_day_19_answers_ignore_hash_seed(monkeypatch, tmp_path):
+    answers = {}
+    for hash_seed in ["0", "1", "2"]:
+        # the runner keeps its inputs and caches next to the script, a copy keeps
+        # them out of the tree
+        day_path = tmp_path / hash_seed / "2022" / "day_19.py"
+        day_path.parent.mkdir(parents=True)
+        shutil.copy(DAY_19, day_path)
+
+        monkeypatch.setenv("PYTHONHASHSEED", hash_seed)
+        report = run_day(str(day_path), ["--test-only", "--no-disk-memo"])
+
+        assert "error" not in report
+        answers[hash_seed] = [part["solution"] for part in report["parts"]]
+
+    # Factory caches must hit the same states whatever the set iteration order
+    assert answers["1"] == answers["0"]
+    assert answers["2"] == answers["0"]
@@ -1,16 +1,80 @@
 # -*- coding: utf-8 -*-
 import json
+import operator
 import os
 import re
 import sys
+from array import array
+from functools import lru_cache
+from itertools import compress, count
 from math import sqrt
-from typing import Any, Callable, Iterable, List, Tuple, Union
+from types import ModuleType
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union
 
 from tools.math import Circle, Point, clamp
 
+INT_PATTERN = re.compile(r"(-?\d+).?")
+# like INT_PATTERN, but every line break also matches as an empty string
+INT_OR_NEWLINE_PATTERN = re.compile(r"(-?\d+).?|\n")
+
+
+@lru_cache(maxsize=None)
+def numpy_or_none() -> Optional[ModuleType]:
+    """NumPy when it's installed, imported on first use rather than with `tools`"""
+    try:
+        import numpy
+    except ImportError:  # optional, the bulk helpers fall back to array('q')
+        return None
+
+    return numpy
+
 
 def str_to_ints(string: str) -> List[int]:
-    return list(map(int, re.findall(r"(-?\d+).?", string)))
+    return list(map(int, INT_PATTERN.findall(string)))
+
+
+def str_to_int_table(
+    text: str, width: Optional[int] = None, numpy: Optional[bool] = None
+) -> Union[List[array], Any]:
+    """`str_to_ints` of every line of `text` in one regex pass over all of it.
+
+    Rows are `array('q')`, or a NumPy array when NumPy is installed and `numpy`
+    isn't False, 2-D when every row holds the same number of ints. A known
+    `width` skips tracking line breaks and splits one flat array into rows.
+    """
+    np = None if numpy is False else numpy_or_none()
+    if numpy and np is None:
+        raise ImportError("numpy=True needs NumPy installed")
+    use_numpy = np is not None
+    text = text.rstrip("\n")
+
+    if width is not None:
+        values = INT_PATTERN.findall(text)
+        if len(values) % width:
+            raise ValueError(f"{len(values)} ints don't fill rows of {width}")
+
+        flat = array("q", map(int, values))
+        if use_numpy:
+            return np.frombuffer(flat, dtype=np.int64).reshape(-1, width)
+
+        return [flat[i : i + width] for i in range(0, len(flat), width)]
+
+    tokens = INT_OR_NEWLINE_PATTERN.findall(text)
+    flat = array("q", map(int, filter(None, tokens)))
+
+    # where each line ends in `flat`, the count of ints before its line break
+    line_breaks = compress(count(), map(operator.not_, tokens))
+    ends = [i - n for n, i in enumerate(line_breaks)] + [len(flat)]
+
+    if use_numpy:
+        values = np.frombuffer(flat, dtype=np.int64)
+        counts = np.diff(ends, prepend=0)
+        if (counts == counts[0]).all():
+            return values.reshape(len(counts), counts[0])
+
+        return np.split(values, ends[:-1])
+
+    return [flat[start:end] for start, end in zip([0] + ends, ends)]
 
 
 def dict_to_str(obj: dict) -> str:
@@ -51,10 +115,6 @@ def minmax(arr: list[Any]) -> Tuple[Any, Any]:
     return min(arr), max(arr)
 
 
-def arr_to_key(arr: list[Any]) -> str:
-    return ",".join(sorted(arr))
-
-
 UP, RIGHT, DOWN, LEFT = ORTHO_DIRS = (
     Point(0, -1),
     Point(1, 0),
@@ -88,50 +148,92 @@ DIRS = {
 ALL_DIRS = [Point(x, y) for x in [-1, 0, 1] for y in [-1, 0, 1] if not x == y == 0]
 
 
-INPUTS_DIR = os.path.join(os.path.dirname(sys.argv[0]), "inputs")
-os.makedirs(INPUTS_DIR, exist_ok=True)
-
 INPUT_FILE_NAME = "input.txt"
 EXAMPLE_FILE_NAME = "example.txt"
 
-CACHE_DIR = os.path.join(os.path.dirname(INPUTS_DIR), ".cache")
-os.makedirs(CACHE_DIR, exist_ok=True)
+
+def __getattr__(name: str) -> str:
+    # INPUTS_DIR and CACHE_DIR sit next to the running script. They're resolved
+    # on first use and created by whatever first writes into them, so importing
+    # tools never touches the filesystem.
+    if name == "INPUTS_DIR":
+        return os.path.join(os.path.dirname(sys.argv[0]), "inputs")
+    if name == "CACHE_DIR":
+        return os.path.join(os.path.dirname(sys.argv[0]), ".cache")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 LETTERS = "abcdefghijklmnopqrstuvwxyz"
 NUMBERS = "0123456789"
 
 
-class ImmutableList(list):
-    def append(self, object: object) -> list:
-        new_list = list(self.copy())
-        new_list.append(object)
+# Sets of up to a few dozen items as int bitmasks, bit `i` standing for item `i`.
+# Subsets, splits and lookups are then int arithmetic, and tables keyed by
+# a set are plain lists indexed by its mask.
 
-        return ImmutableList(new_list)
 
-    def remove(self, __value: object) -> list:
-        new_list = list(self.copy())
-        new_list.remove(object)
+def items_to_mask(items: Iterable, index: dict) -> int:
+    mask = 0
+    for item in items:
+        mask |= 1 << index[item]
 
-        return ImmutableList(new_list)
+    return mask
 
 
-def subsets(collection: Iterable, k: int) -> Iterable:
-    yield from partition(collection, k, k)
+def mask_to_items(mask: int, items: Sequence) -> list:
+    return [items[i] for i in range(mask.bit_length()) if mask >> i & 1]
 
 
-def partition(collection: Iterable, min: int, k: int) -> Iterable:
-    if len(collection) == 1:
-        yield [collection]
+def gosper_masks(n: int, k: int) -> Iterable[int]:
+    """Every `n` bit mask with exactly `k` bits set, in increasing order"""
+    if k == 0:
+        yield 0
         return
 
-    first = collection[0]
-    for smaller in partition(collection[1:], min - 1, k):
-        if len(smaller) > k:
-            continue
+    mask, limit = (1 << k) - 1, 1 << n
+    while mask < limit:
+        yield mask
+
+        # Gosper's hack: move the lowest block of ones up by one place and
+        # pack the rest of the block back down at the bottom
+        low = mask & -mask
+        ripple = mask + low
+        mask = (((ripple ^ mask) >> 2) // low) | ripple
+
+
+def k_subsets(items: Sequence, k: int) -> Iterable[list]:
+    for mask in gosper_masks(len(items), k):
+        yield mask_to_items(mask, items)
+
+
+def submasks(mask: int) -> Iterable[int]:
+    """Every submask of `mask` from `mask` itself down to 0"""
+    sub = mask
+    while True:
+        yield sub
+        if not sub:
+            return
+        sub = (sub - 1) & mask
+
+
+def complement_pairs(mask: int) -> Iterable[Tuple[int, int]]:
+    """Every split of `mask` into two disjoint halves, each unordered pair once"""
+    # the lowest bit always goes to the first half, so no pair comes up twice
+    low = mask & -mask
+    rest = mask ^ low
+    for sub in submasks(rest):
+        yield sub | low, rest ^ sub
+
 
-        if len(smaller) >= min:
-            for n, subset in enumerate(smaller):
-                yield smaller[:n] + [[first] + subset] + smaller[n + 1 :]
+def max_over_submasks(table: List[Any]) -> List[Any]:
+    """`result[mask]` is the largest `table[sub]` over every submask `sub` of
+    `mask`, for a table indexed by every mask of `log2(len(table))` bits"""
+    result = list(table)
+    for bit in range(len(result).bit_length() - 1):
+        step = 1 << bit
+        for mask in range(len(result)):
+            if mask & step and result[mask ^ step] > result[mask]:
+                result[mask] = result[mask ^ step]
 
-        if len(smaller) < k:
-            yield [[first]] + smaller
+    return result
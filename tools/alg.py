@@ -125,7 +125,7 @@ class Node:
                 queue.extend(node.children.values())
 
     @staticmethod
-    @memoize
+    @memoize(key=lambda start, end: (id(start), id(end)))
     def BFS(start: "Node", end: "Node") -> list["Node"]:
         q = deque([[start]])
         visited = set()
@@ -151,7 +151,7 @@ class Node:
         return []
 
     @staticmethod
-    @memoize
+    @memoize(key=lambda start, end: (id(start), id(end)))
     def DFS(start: "Node", end: "Node") -> list["Node"]:
         if start == end:
             return [start]
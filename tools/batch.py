@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+from tools.bench import format_bytes, format_growth, format_regressions
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def discover_days(year_dir: str, days: Optional[range] = None) -> list[str]:
+    day_paths = sorted(glob.glob(os.path.join(year_dir, "day_*.py")))
+    if days is None:
+        return day_paths
+
+    return [
+        path
+        for path in day_paths
+        if int(os.path.basename(path)[4:-3]) in days  # day_XX.py
+    ]
+
+
+def run_day(day_path: str, runner_args: Optional[list[str]] = None) -> dict:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report_path = os.path.join(tmp_dir, "report.json")
+        cmd = [
+            sys.executable,
+            day_path,
+            "--batch",
+            "--offline",
+            "--report",
+            report_path,
+        ]
+
+        start = time.perf_counter()
+        process = subprocess.run(
+            cmd + (runner_args or []), env=env, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+
+        try:
+            with open(report_path, "r") as f:
+                report = json.load(f)
+        except FileNotFoundError:
+            stderr = process.stderr.strip().splitlines()
+            error = stderr[-1] if stderr else "Not a PuzzleRunner day."
+            report = {"parts": [], "error": error}
+
+    report["path"] = day_path
+    report["elapsed"] = elapsed
+    return report
+
+
+def run_year(
+    year_dir: str,
+    days: Optional[range] = None,
+    workers: Optional[int] = None,
+    runner_args: Optional[list[str]] = None,
+) -> list[dict]:
+    day_paths = discover_days(year_dir, days)
+
+    reports = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(run_day, path, runner_args) for path in day_paths]
+        for future in as_completed(futures):
+            reports.append(future.result())
+
+    return sorted(reports, key=lambda r: r["path"])
+
+
+def format_correct(correct: Optional[bool]) -> str:
+    if correct is None:
+        return "?"
+
+    return "yes" if correct else "NO"
+
+
+def print_report(reports: list[dict], elapsed: float) -> None:
+    print(
+        f"{'puzzle':<24} {'answer':>20} {'correct':>8} {'time (s)':>10} {'peak mem':>10}"
+    )
+    print("-" * 76)
+
+    serial_total = 0
+    for report in reports:
+        serial_total += report["elapsed"]
+        if "error" in report:
+            name = os.path.basename(report["path"])
+            print(f"{name:<24} {'ERROR: ' + report['error']}")
+            continue
+
+        for part in report["parts"]:
+            answer = str(part["solution"])
+            if len(answer) > 20:
+                answer = answer[:17] + "..."
+            if part["test_only"]:
+                answer = "(example) " + answer
+
+            memory = part.get("memory")
+            peak = format_bytes(memory["peak"]) if memory else "-"
+
+            print(
+                f"{part['name']:<24} {answer:>20} {format_correct(part['correct']):>8} {part['wall']:>10.4f} {peak:>10}"
+            )
+
+    print("-" * 76)
+    print(f"{len(reports)} days in {elapsed:.2f}s ({serial_total:.2f}s of day runtime)")
+
+
+def print_regressions(reports: list[dict]) -> bool:
+    """True when a puzzle regressed, or a day or part crashed or timed out"""
+    comparisons = []
+    errored = []
+    for report in reports:
+        name = os.path.basename(report["path"])
+        if "error" in report:
+            print(f"{name}: ERROR: {report['error']}")
+            errored.append(name)
+            continue
+
+        comparisons.extend(report["parts"])
+
+    print(format_regressions(comparisons))
+
+    errored.extend(c["name"] for c in comparisons if c.get("error"))
+    regressed = [
+        c["name"] for c in comparisons if c["regressed"] and not c.get("error")
+    ]
+    if regressed:
+        print(f"{len(regressed)} regressed: {', '.join(regressed)}")
+    if errored:
+        print(f"{len(errored)} errored: {', '.join(errored)}")
+
+    return len(regressed) + len(errored) > 0
+
+
+def print_scaling(reports: list[dict]) -> None:
+    print(f"{'puzzle':<24} {'growth':<24} points")
+    print("-" * 76)
+
+    for report in reports:
+        if "error" in report:
+            name = os.path.basename(report["path"])
+            print(f"{name:<24} {'ERROR: ' + report['error']}")
+            continue
+
+        for part in report["parts"]:
+            points = " ".join(
+                f"{point['size']}={point['wall']:.4f}s"
+                if point["wall"] is not None
+                else f"{point['size']}={point['status']}"
+                for point in part["points"]
+            )
+            print(f"{part['name']:<24} {format_growth(part['exponent']):<24} {points}")
+
+
+def parse_day_range(day_range: str) -> range:
+    start, _, end = day_range.partition("-")
+    return range(int(start), int(end or start) + 1)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run every day of a year in parallel child processes"
+    )
+    parser.add_argument("year", help="year directory, e.g. 2022")
+    parser.add_argument("--days", type=parse_day_range, help="e.g. 5 or 1-12")
+    parser.add_argument("--workers", type=int, help="defaults to the cpu count")
+    parser.add_argument(
+        "--memory", action="store_true", help="record peak memory per puzzle"
+    )
+    parser.add_argument(
+        "--check-regressions",
+        action="store_true",
+        help="benchmark solved puzzles against their baseline, exits 1 on a regression or error",
+    )
+    parser.add_argument(
+        "--scaling",
+        nargs="?",
+        const="",
+        metavar="SIZES",
+        help="fit the growth of every puzzle on generated inputs of comma separated SIZES",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="runs per benchmark")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="slowdown ratio that fails"
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="store results as the baseline"
+    )
+    parser.add_argument(
+        "--timeout", type=float, metavar="SEC", help="wall-clock limit per puzzle"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="address-space limit per puzzle",
+    )
+    args = parser.parse_args(argv)
+
+    limit_args = []
+    if args.timeout is not None:
+        limit_args += ["--timeout", str(args.timeout)]
+    if args.memory_limit is not None:
+        limit_args += ["--memory-limit", str(args.memory_limit)]
+
+    if args.scaling is not None:
+        runner_args = limit_args + ["--scale", args.scaling, "--bench", str(args.runs)]
+
+        # parallel days would compete for cpu and skew the timings
+        reports = run_year(args.year, args.days, args.workers or 1, runner_args)
+        print_scaling(reports)
+        return
+
+    if not args.check_regressions:
+        runner_args = limit_args + (["--memory"] if args.memory else [])
+
+        start = time.perf_counter()
+        reports = run_year(args.year, args.days, args.workers, runner_args)
+        print_report(reports, time.perf_counter() - start)
+        return
+
+    runner_args = limit_args + [
+        "--check-regressions",
+        "--bench",
+        str(args.runs),
+        "--threshold",
+        str(args.threshold),
+    ]
+    if args.update_baseline:
+        runner_args.append("--update-baseline")
+
+    # parallel days would compete for cpu and skew the timings
+    reports = run_year(args.year, args.days, args.workers or 1, runner_args)
+    if print_regressions(reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
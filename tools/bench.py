@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ignore ratios on timings and allocations too small to measure reliably
+REGRESSION_MIN_WALL_SEC = 0.001
+REGRESSION_MIN_PEAK_BYTES = 64 * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "p95": percentile(values, 95),
+    }
+
+
+def time_call(func: Callable, *args) -> Tuple[Any, float, float]:
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    result = func(*args)
+
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    return result, wall, cpu
+
+
+def memory_call(func: Callable, *args) -> Tuple[Any, Dict[str, int]]:
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        end, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, {"peak": peak - start, "net": end - start}
+
+
+def benchmark(
+    puzzle_func: Callable, data_generator: Callable, runs: int
+) -> Tuple[Any, dict]:
+    result = None
+    walls, cpus = [], []
+    for _ in range(max(1, runs)):
+        result, wall, cpu = time_call(puzzle_func, data_generator())
+        walls.append(wall)
+        cpus.append(cpu)
+
+    return result, {
+        "runs": len(walls),
+        "wall": summarize(walls),
+        "cpu": summarize(cpus),
+    }
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+
+    return f"{size:.1f}GiB"
+
+
+def format_memory(memory: Dict[str, int]) -> str:
+    return f"mem[peak={format_bytes(memory['peak'])} net={format_bytes(memory['net'])}]"
+
+
+def format_memos(memos: Dict[str, dict]) -> str:
+    return " ".join(
+        f"{name}[hits={memo['hits']} misses={memo['misses']} size={memo['size']}"
+        + (
+            f"/{memo['maxsize']} evicted={memo['evictions']}]"
+            if memo["maxsize"]
+            else "]"
+        )
+        for name, memo in memos.items()
+    )
+
+
+def format_stats(stats: dict) -> str:
+    formatted = " ".join(
+        f"{kind}[min={stats[kind]['min']:.4f}s median={stats[kind]['median']:.4f}s p95={stats[kind]['p95']:.4f}s]"
+        for kind in ("wall", "cpu")
+    )
+    if "memory" in stats:
+        formatted += " " + format_memory(stats["memory"])
+    if "memo" in stats:
+        formatted += " " + format_memos(stats["memo"])
+
+    return formatted
+
+
+def ratio(baseline: float, current: float) -> float:
+    if not baseline:
+        return 1.0 if not current else float("inf")
+
+    return current / baseline
+
+
+def compare(
+    name: str,
+    baseline: Optional[dict],
+    current: Optional[dict],
+    threshold: float,
+    error: Optional[str] = None,
+) -> dict:
+    comparison = {
+        "name": name,
+        "baseline": baseline,
+        "current": current,
+        "wall_ratio": None,
+        "peak_ratio": None,
+        "regressed": error is not None,
+        "error": error,
+    }
+    if baseline is None or current is None:
+        return comparison
+
+    comparison["wall_ratio"] = ratio(baseline["wall"], current["wall"])
+    comparison["peak_ratio"] = ratio(baseline["peak"], current["peak"])
+    comparison["regressed"] = (
+        comparison["wall_ratio"] > threshold
+        and current["wall"] - baseline["wall"] > REGRESSION_MIN_WALL_SEC
+    ) or (
+        comparison["peak_ratio"] > threshold
+        and current["peak"] - baseline["peak"] > REGRESSION_MIN_PEAK_BYTES
+    )
+
+    return comparison
+
+
+def format_regressions(comparisons: List[dict]) -> str:
+    lines = [
+        f"{'puzzle':<24} {'base (s)':>10} {'now (s)':>10} {'ratio':>6} {'base mem':>10} {'now mem':>10} {'ratio':>6}  status",
+        "-" * 98,
+    ]
+    for comparison in comparisons:
+        current = comparison["current"]
+        baseline = comparison["baseline"]
+        if comparison.get("error"):
+            lines.append(f"{comparison['name']:<24} {comparison['error']}")
+            continue
+
+        if baseline is None:
+            lines.append(
+                f"{comparison['name']:<24} {'-':>10} {current['wall']:>10.4f} {'-':>6} {'-':>10} {format_bytes(current['peak']):>10} {'-':>6}  new baseline"
+            )
+            continue
+
+        status = "REGRESSED" if comparison["regressed"] else "ok"
+        lines.append(
+            f"{comparison['name']:<24} {baseline['wall']:>10.4f} {current['wall']:>10.4f} {comparison['wall_ratio']:>6.2f} "
+            f"{format_bytes(baseline['peak']):>10} {format_bytes(current['peak']):>10} {comparison['peak_ratio']:>6.2f}  {status}"
+        )
+
+    return "\n".join(lines)
+
+
+def fit_exponent(sizes: List[float], times: List[float]) -> Optional[float]:
+    """Least squares slope of log(time) against log(size), `k` in `time ~ size^k`"""
+    points = [
+        (math.log(size), math.log(time))
+        for size, time in zip(sizes, times)
+        if size > 0 and time is not None and time > 0
+    ]
+    if len(points) < 2:
+        return None
+
+    mean_x = statistics.mean(x for x, _ in points)
+    mean_y = statistics.mean(y for _, y in points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+GROWTH_NAMES = {0: "constant", 1: "linear", 2: "quadratic", 3: "cubic"}
+
+
+def format_growth(exponent: Optional[float]) -> str:
+    if exponent is None:
+        return "-"
+
+    name = GROWTH_NAMES.get(round(exponent))
+    if name is None or abs(exponent - round(exponent)) > 0.25:
+        return f"~n^{exponent:.2f}"
+
+    return f"~n^{exponent:.2f} ({name})"
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import argparse
+import hashlib
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DAY_PATH = re.compile(r"^/(\d+)/day/(\d+)(/input|/answer)?$")
+
+ARTICLE = """<main>
+<article class="day-desc"><h2>--- Day {day}: Stand-in ---</h2>
+<p>A locally served stand-in for day {day} of {year}.</p>
+<p>For example:</p>
+<pre><code>{example}</code></pre>
+</article>
+</main>"""
+
+RIGHT_ANSWER = """<main>
+<article><p>That's the right answer! You are one gold star closer.</p></article>
+</main>"""
+
+
+def fake_input(year: int, day: int, lines: int = 1000) -> str:
+    rng = random.Random(year * 100 + day)
+    return "\n".join(str(rng.randint(1, 100_000)) for _ in range(lines)) + "\n"
+
+
+class FakeAOCServer:
+    """Local stand-in for adventofcode.com that serves inputs, articles and
+    answers for every day, so downloads can be exercised and timed offline.
+
+    `latency` seconds are added to every response, the first `flaky` requests to
+    each path fail with a 503, and each request is logged in `requests` as
+    `(time, method, path)`. Articles carry an ETag and answer a matching
+    `If-None-Match` with a 304.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, flaky: int = 0) -> None:
+        self.latency = latency
+        self.flaky = flaky
+        self._failures: dict[str, int] = {}
+        self.requests: list[tuple[float, str, str]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method: str) -> None:
+                with server._lock:
+                    server.requests.append((time.time(), method, self.path))
+                    failures = server._failures.get(self.path, 0)
+                    server._failures[self.path] = failures + 1
+                time.sleep(server.latency)
+
+                if failures < server.flaky:
+                    self.send_error(503)
+                    return
+
+                match = DAY_PATH.match(self.path)
+                if match is None:
+                    self.send_error(404)
+                    return
+
+                year, day, kind = int(match[1]), int(match[2]), match[3]
+                if kind == "/input":
+                    body = fake_input(year, day)
+                elif kind == "/answer":
+                    body = RIGHT_ANSWER
+                else:
+                    example = "\n".join(fake_input(year, day, 5).split()[:5])
+                    body = ARTICLE.format(year=year, day=day, example=example)
+
+                payload = body.encode()
+                etag = f'"{hashlib.sha256(payload).hexdigest()[:16]}"'
+                if kind is None and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                if kind is None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:
+                self._respond("GET")
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._respond("POST")
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeAOCServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve a local adventofcode.com stand-in"
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every response"
+    )
+    parser.add_argument(
+        "--flaky", type=int, default=0, help="503s sent before each path succeeds"
+    )
+    args = parser.parse_args(argv)
+
+    with FakeAOCServer(args.port, args.latency, args.flaky) as server:
+        print(f"Serving on {server.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from tools import ALL_DIRS, ORTHO_DIRS
+
+# (dx, dy, flat offset) for every direction of a neighbourhood
+Offsets = Tuple[Tuple[int, int, int], ...]
+
+
+def to_byte(value: Union[int, str]) -> int:
+    return ord(value) if isinstance(value, str) else value
+
+
+class GridView:
+    """Non-copying window onto a grid's cells, `(x, y)` is
+    `cells[origin + x * x_stride + y * y_stride]`.
+
+    Rows and columns are strided `memoryview`s over the shared buffer, so
+    reversing or transposing a view only changes its strides.
+    """
+
+    def __init__(
+        self,
+        cells: bytearray,
+        width: int,
+        height: int,
+        origin: int = 0,
+        x_stride: int = 1,
+        y_stride: Optional[int] = None,
+    ) -> None:
+        self.cells = memoryview(cells)
+        self.width = width
+        self.height = height
+        self.origin = origin
+        self.x_stride = x_stride
+        self.y_stride = width if y_stride is None else y_stride
+
+    def index(self, x: int, y: int) -> int:
+        """Flat index of `(x, y)` in the underlying grid"""
+        return self.origin + x * self.x_stride + y * self.y_stride
+
+    def _line(self, start: int, length: int, stride: int) -> memoryview:
+        stop = start + length * stride
+        # a negative stop would count from the end of the buffer
+        return self.cells[start : stop if stop >= 0 else None : stride]
+
+    def row(self, y: int) -> memoryview:
+        return self._line(self.index(0, y), self.width, self.x_stride)
+
+    def row_indices(self, y: int) -> range:
+        """Flat indices of the cells of `row(y)`, in the same order"""
+        start = self.index(0, y)
+        return range(start, start + self.width * self.x_stride, self.x_stride)
+
+    def column(self, x: int) -> memoryview:
+        return self._line(self.index(x, 0), self.height, self.y_stride)
+
+    def rows(self) -> Iterator[memoryview]:
+        return (self.row(y) for y in range(self.height))
+
+    def columns(self) -> Iterator[memoryview]:
+        return (self.column(x) for x in range(self.width))
+
+    def reversed(self) -> "GridView":
+        """Same cells with every row running back to front"""
+        return GridView(
+            self.cells,
+            self.width,
+            self.height,
+            self.index(self.width - 1, 0),
+            -self.x_stride,
+            self.y_stride,
+        )
+
+    def transposed(self) -> "GridView":
+        return GridView(
+            self.cells,
+            self.height,
+            self.width,
+            self.origin,
+            self.y_stride,
+            self.x_stride,
+        )
+
+    def __getitem__(self, key: Tuple[int, int]) -> int:
+        return self.cells[self.index(*key)]
+
+
+class Grid:
+    """Rectangular grid of one byte cells, stored row after row in a flat
+    `bytearray` so cell `(x, y)` is `cells[y * width + x]`.
+
+    `ortho_offsets` and `all_offsets` hold the flat offsets of the `ORTHO_DIRS`
+    and `ALL_DIRS` neighbourhoods, stepping to a neighbour is an integer add.
+    `view()` gives rows, columns, reversed and transposed views without copying.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        cells: Optional[bytearray] = None,
+        fill: Union[int, str] = 0,
+    ) -> None:
+        if cells is None:
+            cells = bytearray([to_byte(fill)]) * (width * height)
+        if len(cells) != width * height:
+            raise ValueError(f"{len(cells)} cells don't fill a {width}x{height} grid")
+
+        self.width = width
+        self.height = height
+        self.cells = cells
+
+        self.ortho_offsets = self.offsets(ORTHO_DIRS)
+        self.all_offsets = self.offsets(ALL_DIRS)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Grid":
+        rows = [line.encode() for line in lines]
+        width = len(rows[0]) if rows else 0
+        if any(len(row) != width for row in rows):
+            raise ValueError("Grid rows must all have the same length")
+
+        return cls(width, len(rows), bytearray().join(rows))
+
+    def offsets(self, dirs: Iterable) -> Offsets:
+        return tuple((dx, dy, dy * self.width + dx) for dx, dy in dirs)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def xy(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def neighbours(
+        self, index: int, offsets: Optional[Offsets] = None
+    ) -> Iterator[int]:
+        """Flat indices of the neighbours of `index` inside the grid, orthogonal
+        ones unless other `offsets` are given"""
+        y, x = divmod(index, self.width)
+        for dx, dy, offset in offsets or self.ortho_offsets:
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height:
+                yield index + offset
+
+    def find(self, value: Union[int, str]) -> int:
+        return self.cells.index(to_byte(value))
+
+    def find_all(self, value: Union[int, str]) -> Iterator[int]:
+        value = to_byte(value)
+        index = self.cells.find(value)
+        while index != -1:
+            yield index
+            index = self.cells.find(value, index + 1)
+
+    def view(self) -> GridView:
+        return GridView(self.cells, self.width, self.height)
+
+    def row(self, y: int) -> memoryview:
+        return self.view().row(y)
+
+    def column(self, x: int) -> memoryview:
+        return self.view().column(x)
+
+    def copy(self) -> "Grid":
+        return Grid(self.width, self.height, self.cells.copy())
+
+    def _flat(self, key: Union[int, Tuple[int, int]]) -> int:
+        if isinstance(key, tuple):
+            x, y = key
+            if not self.in_bounds(x, y):
+                raise IndexError(
+                    f"{key} is outside the {self.width}x{self.height} grid"
+                )
+            return y * self.width + x
+
+        return key
+
+    def __getitem__(self, key: Union[int, Tuple[int, int]]) -> int:
+        return self.cells[self._flat(key)]
+
+    def __setitem__(self, key: Union[int, Tuple[int, int]], value: Union[int, str]):
+        self.cells[self._flat(key)] = to_byte(value)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __str__(self) -> str:
+        return "\n".join(
+            self.cells[start : start + self.width].decode()
+            for start in range(0, len(self.cells), self.width)
+        )
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from tools import ALL_DIRS, numpy_or_none
+from tools.grid import Grid
+
+np = numpy_or_none()  # optional, the kernels fall back to BitField
+
+
+@lru_cache(maxsize=None)
+def _masks(width: int, height: int) -> Tuple[int, int, int]:
+    """Bits of every cell, of the first column and of the last column"""
+    full = (1 << width * height) - 1
+    first_column = full // ((1 << width) - 1) if width else 0
+    return full, first_column, first_column << max(width - 1, 0)
+
+
+class BitField:
+    """Occupancy of a width x height grid as the bits of one int, cell `(x, y)`
+    is bit `y * width + x`. Whole-field operators run as big-int arithmetic."""
+
+    __slots__ = ("width", "height", "bits")
+
+    def __init__(self, width: int, height: int, bits: int = 0) -> None:
+        self.width = width
+        self.height = height
+        self.bits = bits
+
+    def _new(self, bits: int) -> "BitField":
+        return BitField(self.width, self.height, bits)
+
+    def __and__(self, other: "BitField") -> "BitField":
+        return self._new(self.bits & other.bits)
+
+    def __or__(self, other: "BitField") -> "BitField":
+        return self._new(self.bits | other.bits)
+
+    def __xor__(self, other: "BitField") -> "BitField":
+        return self._new(self.bits ^ other.bits)
+
+    def __invert__(self) -> "BitField":
+        return self._new(~self.bits & _masks(self.width, self.height)[0])
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitField):
+            return NotImplemented
+
+        return (self.width, self.height, self.bits) == (
+            other.width,
+            other.height,
+            other.bits,
+        )
+
+    def any(self) -> bool:
+        return self.bits != 0
+
+    def sum(self) -> int:
+        return bin(self.bits).count("1")
+
+    def indices(self) -> Iterator[int]:
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+
+Field = Union[BitField, Any]  # a BitField or a 2-D NumPy bool array
+
+
+def occupancy(
+    grid: Grid, values: Union[int, str, Iterable], numpy: Optional[bool] = None
+) -> Field:
+    """Field of the grid cells holding any of `values`, bytes or characters of a
+    string, NumPy backed when NumPy is installed and `numpy` isn't False"""
+    if numpy and np is None:
+        raise ImportError("numpy=True needs NumPy installed")
+    use_numpy = np is not None and numpy is not False
+
+    if isinstance(values, int):
+        values = [values]
+    values = bytes(ord(v) if isinstance(v, str) else v for v in values)
+
+    if use_numpy:
+        cells = np.frombuffer(grid.cells, dtype=np.uint8).reshape(
+            grid.height, grid.width
+        )
+        return np.isin(cells, np.frombuffer(values, dtype=np.uint8))
+
+    table = bytearray(b"0" * 256)
+    for value in values:
+        table[value] = ord("1")
+    # bit 0 is the first cell, so the binary string runs back to front
+    digits = bytes(grid.cells).translate(table)[::-1]
+    return BitField(grid.width, grid.height, int(digits, 2) if digits else 0)
+
+
+def shift(field: Field, direction: Iterable[int]) -> Field:
+    """Every occupied cell moved by `direction`, cells pushed off the edge are
+    dropped and the vacated ones are empty"""
+    dx, dy = direction
+
+    if isinstance(field, BitField):
+        width, height = field.width, field.height
+        full, first_column, _ = _masks(width, height)
+
+        bits = field.bits
+        # clear the columns that would wrap onto the next or previous row
+        if dx:
+            edge = first_column * ((1 << min(abs(dx), width)) - 1)
+            bits &= ~(edge << width - min(dx, width) if dx > 0 else edge)
+
+        offset = dy * width + dx
+        bits = bits << offset if offset >= 0 else bits >> -offset
+        return field._new(bits & full)
+
+    shifted = np.zeros_like(field)
+    height, width = field.shape
+    if abs(dx) >= width or abs(dy) >= height:
+        return shifted  # every cell is pushed off the edge
+
+    shifted[max(dy, 0) : height + min(dy, 0), max(dx, 0) : width + min(dx, 0)] = field[
+        max(-dy, 0) : height - max(dy, 0), max(-dx, 0) : width - max(dx, 0)
+    ]
+    return shifted
+
+
+def any_neighbour(field: Field, dirs: Iterable = ALL_DIRS) -> Field:
+    """Cells with at least one occupied neighbour among `dirs`"""
+    result = None
+    for dx, dy in dirs:
+        neighbours = shift(field, (-dx, -dy))
+        result = neighbours if result is None else result | neighbours
+
+    return result
+
+
+def neighbour_count(
+    field: Field, dirs: Iterable = ALL_DIRS
+) -> Union[List[BitField], Any]:
+    """Occupied neighbours among `dirs` of every cell.
+
+    A NumPy field gives a 2-D count array. A BitField gives the counts
+    bit-sliced, `planes[i]` holding bit `i` of every cell's count, summed with
+    a ripple-carry adder over whole fields. Pass either to `count_is`.
+    """
+    if isinstance(field, BitField):
+        planes = [0]
+        for dx, dy in dirs:
+            carry = shift(field, (-dx, -dy)).bits
+            for i, plane in enumerate(planes):
+                planes[i], carry = plane ^ carry, plane & carry
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+
+        return [field._new(plane) for plane in planes]
+
+    counts = np.zeros(field.shape, dtype=np.uint8)
+    for dx, dy in dirs:
+        counts += shift(field, (-dx, -dy))
+
+    return counts
+
+
+def count_is(counts: Union[List[BitField], Any], *values: int) -> Field:
+    """Cells whose neighbour count is one of `values`"""
+    if not isinstance(counts, list):
+        return np.isin(counts, values)
+
+    result = counts[0]._new(0)
+    for value in values:
+        if value >> len(counts):
+            continue
+
+        matches = ~result._new(0)
+        for i, plane in enumerate(counts):
+            matches &= plane if value >> i & 1 else ~plane
+        result |= matches
+
+    return result
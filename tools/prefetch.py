@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Optional
+from urllib.parse import urlparse
+
+from tools import INPUT_FILE_NAME
+from tools.batch import parse_day_range
+from tools.fake_aoc import FakeAOCServer
+from tools.web import AOC_URL, AOCWebInterface, RequestLimiter
+
+
+def is_aoc_url(url: str) -> bool:
+    return urlparse(url).hostname == urlparse(AOC_URL).hostname
+
+
+def missing_artifacts(aoc: AOCWebInterface) -> list[str]:
+    day_dir = os.path.join(aoc.inputs_dir, aoc.day_str)
+
+    missing = []
+    if not os.path.exists(os.path.join(day_dir, INPUT_FILE_NAME)):
+        missing.append("input")
+    if not (
+        os.path.exists(aoc.article_cache_path)
+        or os.path.exists(aoc.legacy_article_cache_path)
+    ):
+        missing.append("article")
+    if not os.path.exists(os.path.join(day_dir, "README.md")):
+        missing.append("prompt")
+
+    return missing
+
+
+def prefetch_day(year_dir: str, year: int, day: int, base_url: str = AOC_URL) -> dict:
+    aoc = AOCWebInterface(year, day, year_dir=year_dir, base_url=base_url)
+    report = {"day": day, "fetched": missing_artifacts(aoc), "error": None}
+
+    start = time.perf_counter()
+    try:
+        if "input" in report["fetched"]:
+            aoc.download_input()
+        if report["fetched"]:
+            aoc.download_prompt()
+            aoc.download_examples()
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["elapsed"] = time.perf_counter() - start
+
+    return report
+
+
+def prefetch_year(
+    year_dir: str,
+    days: range,
+    workers: int,
+    base_url: str = AOC_URL,
+) -> list[dict]:
+    year = int(os.path.basename(os.path.normpath(year_dir)))
+
+    reports = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(prefetch_day, year_dir, year, day, base_url) for day in days
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+
+            fetched = ", ".join(report["fetched"]) or "cached"
+            print(f"day_{report['day']:02d}: {report['error'] or fetched}")
+
+    return sorted(reports, key=lambda r: r["day"])
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Download every missing input, prompt and example of a year concurrently"
+    )
+    parser.add_argument("year", help="year directory, e.g. 2022")
+    parser.add_argument(
+        "--days", type=parse_day_range, default=range(1, 26), help="e.g. 5 or 1-12"
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--base-url", default=AOC_URL)
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="download from a local stand-in server into a temporary directory",
+    )
+    parser.add_argument(
+        "--fake-latency",
+        type=float,
+        default=0.0,
+        metavar="SEC",
+        help="seconds the stand-in server adds to every response",
+    )
+    parser.add_argument(
+        "--rate-scale",
+        type=float,
+        default=1.0,
+        help="scale the request spacing, below 1 only for --fake or a stand-in --base-url",
+    )
+    args = parser.parse_args(argv)
+
+    if args.rate_scale < 1 and not args.fake and is_aoc_url(args.base_url):
+        parser.error(f"--rate-scale {args.rate_scale} would spam {AOC_URL}")
+
+    with ExitStack() as stack:
+        year_dir, base_url = args.year, args.base_url
+        if args.fake:
+            # fake files and request times stay out of the real year directory
+            # and the host-wide limiter, the limiter is a singleton so this
+            # instance is the one every download uses
+            scratch = stack.enter_context(tempfile.TemporaryDirectory())
+            RequestLimiter(os.path.join(scratch, "requests.sqlite3"))
+            year_dir = os.path.join(
+                scratch, os.path.basename(os.path.normpath(year_dir))
+            )
+            server = stack.enter_context(FakeAOCServer(latency=args.fake_latency))
+            base_url = server.url
+
+        RequestLimiter().rate_scale = args.rate_scale
+
+        start = time.perf_counter()
+        reports = prefetch_year(year_dir, args.days, args.workers, base_url)
+        elapsed = time.perf_counter() - start
+
+    fetched = sum(len(report["fetched"]) for report in reports if not report["error"])
+    errors = sum(report["error"] is not None for report in reports)
+    print(
+        f"{fetched} artifacts for {len(reports)} days in {elapsed:.2f}s, {errors} errors"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+from tools import CACHE_DIR
+
+PROFILES_DIR = os.path.join(CACHE_DIR, "profiles")
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread that enters it every `interval` seconds.
+
+    Output is in the collapsed stack format (`root;child;leaf count`), which
+    flamegraph.pl and speedscope.app both import directly.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.samples = Counter()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id: Optional[int] = None
+        self._root: Optional[FrameType] = None
+        self._switch_interval: Optional[float] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+
+            stack = []
+            while frame is not None and frame is not self._root:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread_id = threading.get_ident()
+        self._root = sys._getframe(1)
+
+        # the sampler can only run when the profiled thread drops the GIL
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        self._root = None
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.items())
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+        return path
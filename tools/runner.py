@@ -1,22 +1,163 @@
 # -*- coding: utf-8 -*-
+import argparse
 import json
 import os
-from datetime import datetime
-from typing import Any, Optional
+import random
+import sys
+from contextlib import nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any, Optional
 
-from tools import CACHE_DIR
+from tools import CACHE_DIR, INPUT_FILE_NAME, INPUTS_DIR
+from tools.bench import (
+    benchmark,
+    compare,
+    fit_exponent,
+    format_growth,
+    format_memory,
+    format_memos,
+    format_regressions,
+    format_stats,
+    memory_call,
+    time_call,
+)
+from tools.profiler import PROFILES_DIR, SamplingProfiler
+from tools.sandbox import (
+    CAN_ISOLATE,
+    ERROR,
+    OK,
+    IsolatedRun,
+    PuzzleAborted,
+    run_isolated,
+)
+from tools.store import ResultsStore, set_memo_input
 from tools.utils import (
+    PuzzleInput,
     extract_day_from_path,
     extract_year_from_path,
-    file_line_generator,
     get_file_stem,
+    memo_stats,
+    reset_memos,
 )
-from tools.web import AOCWebInterface
 
-SOLUTIONS_FILE = os.path.join(CACHE_DIR, "solutions.json")
+if TYPE_CHECKING:
+    from tools.web import AOCWebInterface
+
+LEGACY_SOLUTIONS_FILE = os.path.join(CACHE_DIR, "solutions.json")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--test-only", action="store_true", help="only run against the examples"
+    )
+    parser.add_argument(
+        "--bench",
+        type=int,
+        default=0,
+        metavar="N",
+        help="time N runs of each puzzle against the cached input, no web calls",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="skip all web and HTML work when the input and prompt are cached",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="record peak and net allocated memory per puzzle with tracemalloc",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write a collapsed-stack sample profile per puzzle to .cache/profiles",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=1.0,
+        metavar="MS",
+        help="milliseconds between --profile stack samples",
+    )
+    parser.add_argument(
+        "--no-disk-memo",
+        action="store_true",
+        help="skip @disk_memoize results stored by earlier runs, and don't store new ones",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SEC",
+        help="run each puzzle in a child process killed after SEC seconds",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="run each puzzle in a child process limited to MB of address space",
+    )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="run each puzzle's real input in a child process alongside its example, a failing example cancels it",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="run every puzzle once without web calls or submit prompts",
+    )
+    parser.add_argument(
+        "--check-regressions",
+        action="store_true",
+        help="benchmark every solved puzzle against its stored baseline, exits 1 on a regression",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="--check-regressions slowdown ratio that counts as a regression",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the --check-regressions results as the new baseline",
+    )
+    parser.add_argument(
+        "--scale",
+        nargs="?",
+        const="",
+        metavar="SIZES",
+        help="time each puzzle on generated inputs of comma separated SIZES and fit the growth",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="--scale input generator seed"
+    )
+    parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="write the --batch, --check-regressions or --scale results as JSON to PATH",
+    )
+
+    args, _ = parser.parse_known_args(argv)
+    if not CAN_ISOLATE and (
+        args.timeout is not None or args.memory_limit is not None or args.concurrent
+    ):
+        parser.error(
+            "--timeout, --memory-limit and --concurrent need os.fork, which this platform lacks"
+        )
+
+    return args
+
+
+def parse_sizes(sizes: Optional[str]) -> list[int]:
+    return [int(size) for size in (sizes or "").split(",") if size.strip()]
 
 
 class PuzzleRunner:
+    # default --scale input sizes, override for puzzles that grow quickly
+    SCALE_SIZES = (1000, 2000, 4000, 8000)
+
     def __init__(self, test_only=False) -> None:
         self._puzzle_funcs = [self.puzzle_one, self.puzzle_two]
         self._example_solutions = [
@@ -28,52 +169,187 @@ class PuzzleRunner:
         self.day = extract_day_from_path()
         self.year = extract_year_from_path()
 
-        self.solutions = self._load_solutions()
+        self._input: Optional[PuzzleInput] = None
+        self._examples: dict[int, PuzzleInput] = {}
+
+        self.args = parse_args()
+        self.store = ResultsStore()
+        self._disk_memo = not self.args.no_disk_memo
+
+        self._import_legacy_solutions()
+
+        if self.args.check_regressions:
+            report = self.check_regressions(
+                self.args.bench or 5, self.args.threshold, self.args.update_baseline
+            )
+            self._write_report(report, self.args.report)
+
+            print(format_regressions(report["parts"]))
+            if any(part["regressed"] for part in report["parts"]):
+                sys.exit(1)
+            return
+
+        if self.args.scale is not None:
+            report = self.scale(
+                parse_sizes(self.args.scale), self.args.bench or 3, self.args.seed
+            )
+            self._write_report(report, self.args.report)
+            return
+
+        if self.args.bench:
+            self.bench(self.args.bench)
+            return
+
+        if self.args.batch:
+            self.batch(test_only or self.args.test_only, self.args.report)
+            return
+
+        self._aoc = None
+        self._download()
+
+        self.run(test_only or self.args.test_only)
+
+    @property
+    def aoc(self) -> "AOCWebInterface":
+        if self._aoc is None:
+            # requests, bs4 and markdownify only load once a day needs the web
+            from tools.web import AOCWebInterface
+
+            self._aoc = AOCWebInterface(self.year, self.day)
+
+        return self._aoc
+
+    def _has_cached_artifacts(self, puzzle_num: int = 1) -> bool:
+        day_dir = os.path.join(INPUTS_DIR, self.name)
+        prompt_path = os.path.join(day_dir, "README.md")
+
+        if not os.path.exists(os.path.join(day_dir, INPUT_FILE_NAME)):
+            return False
+
+        try:
+            with open(prompt_path, "r") as f:
+                prompt = f.read()
+        except FileNotFoundError:
+            return False
+
+        return puzzle_num < 2 or "Part Two" in prompt
+
+    def _download(self, puzzle_num: int = 1) -> None:
+        if self.args.offline and self._has_cached_artifacts(puzzle_num):
+            return
 
-        self.aoc = AOCWebInterface(self.year, self.day)
         self.aoc.download_input()
-        self.aoc.download_prompt()
-        self.aoc.download_examples()
+        self.aoc.download_prompt(puzzle_num)
+        self.aoc.download_examples(puzzle_num)
 
-        self.run(test_only)
+    @property
+    def input_hash(self) -> str:
+        try:
+            return self.get_input().digest
+        except FileNotFoundError:
+            return ""
 
-    def _load_solutions(self) -> dict:
+    def _import_legacy_solutions(self) -> None:
         try:
-            with open(SOLUTIONS_FILE, "r") as f:
-                solutions = json.load(f)
+            with open(LEGACY_SOLUTIONS_FILE, "r") as f:
+                legacy = json.load(f)
         except FileNotFoundError:
-            solutions = {}
+            return
 
-        return solutions
+        if not self.input_hash:
+            return
+
+        for part, puzzle_func in enumerate(self._puzzle_funcs, 1):
+            entry = legacy.get(puzzle_func.__qualname__)
+            if entry is None or self.store.latest(self.year, self.day, part, "solve"):
+                continue
+
+            self._save(
+                part,
+                entry["solution"],
+                entry["correct"],
+                entry.get("test_result"),
+                memory=entry.get("memory"),
+                timestamp=entry["timestamp"],
+            )
 
     def _save(
-        self, func_name: str, result: Any, correct: bool, test_result: Any = None
+        self,
+        part: int,
+        result: Any,
+        correct: Optional[bool],
+        test_result: Any = None,
+        kind: str = "solve",
+        **kwargs,
     ) -> None:
-        self.solutions[func_name] = {
-            "timestamp": str(datetime.now()),
-            "solution": result,
-            "correct": correct,
-            "test_result": test_result,
-        }
+        self.store.record(
+            self.year,
+            self.day,
+            part,
+            self.input_hash,
+            kind,
+            result,
+            correct=correct,
+            test_result=test_result,
+            **kwargs,
+        )
 
-        with open(SOLUTIONS_FILE, "w") as f:
-            json.dump(self.solutions, f)
+    def _solved(self, part: int) -> Optional[dict]:
+        return self.store.solved(self.year, self.day, part, self.input_hash)
 
     def get_example_str(self) -> str:
         raise NotImplementedError
 
-    def get_example(self, puzzle_num=1) -> list[str]:
+    def get_example(self, puzzle_num=1) -> PuzzleInput:
+        if puzzle_num in self._examples:
+            return self._examples[puzzle_num]
+
         try:
-            return [
+            lines = [
                 item for item in self.get_example_str().split("\n") if len(item) > 0
             ]
+            example = PuzzleInput(lines=lines, parser=self.parse)
         except NotImplementedError:
-            while puzzle_num > 0:
+            example = None
+            file_num = puzzle_num
+            while file_num > 0 and example is None:
                 try:
-                    return file_line_generator(file_name=f"EXAMPLE_{puzzle_num}.txt")
+                    example = PuzzleInput.from_file(
+                        file_name=f"EXAMPLE_{file_num}.txt", parser=self.parse
+                    )
                 except FileNotFoundError:
-                    puzzle_num -= 1
+                    file_num -= 1
+
+            if example is None:
+                raise FileNotFoundError
+
+        self._examples[puzzle_num] = example
+        return example
+
+    def read_input(self) -> PuzzleInput:
+        return PuzzleInput.from_file(parser=self.parse)
+
+    def _track_input(self, data: PuzzleInput) -> PuzzleInput:
+        set_memo_input(data.digest if self._disk_memo else None)
+        return data
 
+    def _fresh_input(self) -> PuzzleInput:
+        """Input for a benchmark run that starts from empty memo caches"""
+        reset_memos()
+        return self._track_input(self.read_input())
+
+    def get_input(self) -> PuzzleInput:
+        if self._input is None:
+            self._input = self.read_input()
+
+        return self._input
+
+    def parse(self, data: PuzzleInput) -> Any:
+        """Shared parse of the puzzle data, available to both parts as `data.parsed`"""
+        raise NotImplementedError
+
+    def generate_input(self, size: int, rng: random.Random) -> str:
+        """A valid puzzle input that grows with `size`, used by `--scale`"""
         raise NotImplementedError
 
     def puzzle_one_example_solution(self) -> Any:
@@ -89,8 +365,9 @@ class PuzzleRunner:
         return None
 
     def _run_puzzle(self, puzzle_func, data_generator) -> Optional[Any]:
+        reset_memos()
         try:
-            result = puzzle_func(data_generator())
+            result = puzzle_func(self._track_input(data_generator()))
         except NotImplementedError:
             result = "Not Implemented"
         except FileNotFoundError:
@@ -98,46 +375,371 @@ class PuzzleRunner:
 
         return result
 
+    def _measure_puzzle(
+        self, puzzle_func, data_generator, memory: bool = False
+    ) -> tuple[Any, Optional[dict]]:
+        if self.args.profile:
+            profiler = SamplingProfiler(self.args.profile_interval / 1000)
+        else:
+            profiler = nullcontext()
+
+        with profiler:
+            if memory or self.args.memory:
+                result, memory = memory_call(
+                    self._run_puzzle, puzzle_func, data_generator
+                )
+            else:
+                result, memory = self._run_puzzle(puzzle_func, data_generator), None
+
+        if self.args.profile:
+            profile_path = profiler.save(
+                os.path.join(PROFILES_DIR, f"{puzzle_func.__qualname__}.collapsed")
+            )
+            print(f"PROFILE {puzzle_func.__qualname__}: {profile_path}")
+
+        return result, memory
+
+    @property
+    def _memory_limit(self) -> Optional[int]:
+        if self.args.memory_limit is None:
+            return None
+
+        return int(self.args.memory_limit * 1024 * 1024)
+
+    def _isolate(self, func, *args) -> tuple[Any, Optional[dict]]:
+        if self.args.timeout is None and self.args.memory_limit is None:
+            return func(*args), None
+
+        outcome = run_isolated(
+            func, *args, timeout=self.args.timeout, memory_limit=self._memory_limit
+        )
+        if outcome["status"] != OK:
+            raise PuzzleAborted(outcome)
+
+        return outcome["result"], outcome
+
+    def _bench_part(
+        self, puzzle_func, runs: int, memory: bool = False
+    ) -> tuple[Any, dict]:
+        result, stats = benchmark(puzzle_func, self._fresh_input, runs)
+        memos = memo_stats()
+        if memos:
+            stats["memo"] = memos
+
+        if memory or self.args.memory or self.args.profile:
+            _, measured = self._measure_puzzle(puzzle_func, self.read_input, memory)
+            if measured is not None:
+                stats["memory"] = measured
+
+        return result, stats
+
+    def _disable_disk_memo(self) -> None:
+        # timings on stored results would only time the sqlite lookups
+        self._disk_memo = False
+        set_memo_input(None)
+
+    def bench(self, runs: int) -> None:
+        self.is_test = False
+        self._disable_disk_memo()
+        for part, puzzle_func in enumerate(self._puzzle_funcs, 1):
+            func_name = puzzle_func.__qualname__
+
+            try:
+                (result, stats), _ = self._isolate(self._bench_part, puzzle_func, runs)
+            except NotImplementedError:
+                print(f"BENCH {func_name}: Not Implemented")
+                continue
+            except FileNotFoundError:
+                print(f"BENCH {func_name}: No input file.")
+                continue
+            except PuzzleAborted as e:
+                print(f"BENCH {func_name}: {e}")
+                continue
+
+            self._save(
+                part,
+                result,
+                None,
+                kind="bench",
+                wall=stats["wall"]["median"],
+                cpu=stats["cpu"]["median"],
+                memory=stats.get("memory"),
+                stats=stats,
+            )
+            print(f"BENCH {func_name}: {result} x{stats['runs']} {format_stats(stats)}")
+
+    def scale(self, sizes: list[int], runs: int, seed: int = 0) -> dict:
+        self.is_test = False
+        self._disable_disk_memo()
+
+        report = {"year": self.year, "day": self.day, "parts": []}
+        try:
+            inputs = {
+                size: self.generate_input(size, random.Random(seed)).split("\n")
+                for size in sizes or self.SCALE_SIZES
+            }
+        except NotImplementedError:
+            print(f"SCALE {self.name}: no input generator")
+            report["error"] = "No input generator."
+            return report
+
+        for puzzle_func in self._puzzle_funcs:
+            func_name = puzzle_func.__qualname__
+
+            points = []
+            for size, lines in inputs.items():
+                data_generator = partial(PuzzleInput, lines=lines, parser=self.parse)
+                try:
+                    (_, stats), _ = self._isolate(
+                        benchmark, puzzle_func, data_generator, runs
+                    )
+                except NotImplementedError:
+                    break
+                except PuzzleAborted as e:
+                    if str(e.outcome["result"]).startswith("NotImplementedError"):
+                        break
+                    status, wall = str(e), None
+                except Exception as e:
+                    status, wall = f"{ERROR}: {type(e).__name__}: {e}", None
+                else:
+                    status, wall = OK, stats["wall"]["median"]
+
+                points.append({"size": size, "status": status, "wall": wall})
+                if wall is None:
+                    print(f"SCALE {func_name} n={size}: {status}")
+                    break  # larger inputs won't do any better
+                print(f"SCALE {func_name} n={size}: {wall:.4f}s")
+
+            if not points:
+                print(f"SCALE {func_name}: Not Implemented")
+                continue
+
+            timed = [point for point in points if point["wall"] is not None]
+            exponent = fit_exponent(
+                [point["size"] for point in timed], [point["wall"] for point in timed]
+            )
+            report["parts"].append(
+                {"name": func_name, "points": points, "exponent": exponent}
+            )
+            print(f"SCALE {func_name}: {format_growth(exponent)}")
+
+        return report
+
+    def _batch_part(
+        self, puzzle_func, data_generator
+    ) -> tuple[Any, float, float, dict, dict]:
+        result, wall, cpu = time_call(self._run_puzzle, puzzle_func, data_generator)
+        result = json.loads(json.dumps(result, default=str))
+        memos = memo_stats()
+
+        memory = None
+        if self.args.memory or self.args.profile:
+            _, memory = self._measure_puzzle(puzzle_func, data_generator)
+
+        return result, wall, cpu, memory, memos
+
+    def batch(self, test_only: bool = False, report_path: Optional[str] = None) -> dict:
+        self.is_test = test_only
+        data_generator = self.get_example if test_only else self.get_input
+
+        report = {"year": self.year, "day": self.day, "parts": []}
+        for part, puzzle_func in enumerate(self._puzzle_funcs, 1):
+            func_name = puzzle_func.__qualname__
+
+            status, usage, memos = OK, None, None
+            try:
+                (result, wall, cpu, memory, memos), outcome = self._isolate(
+                    self._batch_part, puzzle_func, data_generator
+                )
+                usage = outcome and outcome["usage"]
+            except PuzzleAborted as e:
+                status, usage = e.outcome["status"], e.outcome["usage"]
+                result, wall, cpu, memory = str(e), e.outcome["wall"], None, None
+            except Exception as e:
+                status = ERROR
+                result, wall, cpu, memory = f"{type(e).__name__}: {e}", 0.0, 0.0, None
+
+            correct = None
+            solved = None if test_only else self._solved(part)
+            if solved is not None:
+                correct = solved["solution"] == result
+
+            if not test_only and self.input_hash:
+                self._save(
+                    part,
+                    result,
+                    correct,
+                    kind="batch",
+                    wall=wall,
+                    cpu=cpu,
+                    memory=memory,
+                )
+
+            report["parts"].append(
+                {
+                    "name": func_name,
+                    "status": status,
+                    "solution": result,
+                    "correct": correct,
+                    "test_only": test_only,
+                    "wall": wall,
+                    "cpu": cpu,
+                    "memory": memory,
+                    "usage": usage,
+                    "memo": memos,
+                }
+            )
+            print(f"BATCH {func_name}: {result} {wall:.4f}s")
+            if memos:
+                print(f"MEMO {func_name}: {format_memos(memos)}")
+
+        self._write_report(report, report_path)
+        return report
+
+    def check_regressions(
+        self, runs: int, threshold: float, update_baseline: bool = False
+    ) -> dict:
+        self.is_test = False
+        self._disable_disk_memo()
+
+        report = {"year": self.year, "day": self.day, "parts": []}
+        for part, puzzle_func in enumerate(self._puzzle_funcs, 1):
+            if self._solved(part) is None:
+                continue
+
+            try:
+                (result, stats), _ = self._isolate(
+                    self._bench_part, puzzle_func, runs, True
+                )
+            except PuzzleAborted as e:
+                print(f"CHECK {puzzle_func.__qualname__}: {e}")
+                report["parts"].append(
+                    compare(puzzle_func.__qualname__, None, None, threshold, str(e))
+                )
+                continue
+
+            current = {"wall": stats["wall"]["median"], "peak": stats["memory"]["peak"]}
+
+            baseline = None
+            if not update_baseline:
+                baseline = self.store.latest(
+                    self.year, self.day, part, "baseline", self.input_hash
+                )
+
+            self._save(
+                part,
+                result,
+                None,
+                kind="bench" if baseline else "baseline",
+                wall=stats["wall"]["median"],
+                cpu=stats["cpu"]["median"],
+                memory=stats["memory"],
+                stats=stats,
+            )
+
+            if baseline is not None:
+                baseline = {
+                    "wall": baseline["wall"],
+                    "peak": baseline["memory"]["peak"],
+                }
+
+            report["parts"].append(
+                compare(puzzle_func.__qualname__, baseline, current, threshold)
+            )
+
+        return report
+
+    def _write_report(self, report: dict, report_path: Optional[str]) -> None:
+        if report_path is None:
+            return
+
+        with open(report_path, "w") as f:
+            json.dump(report, f, default=str)
+
+    def _run_real(
+        self, puzzle_func
+    ) -> tuple[tuple[Any, Optional[dict]], float, float, dict]:
+        self.is_test = False
+        return time_call(self._measure_puzzle, puzzle_func, self.get_input) + (
+            memo_stats(),
+        )
+
     def run(self, test_only: bool = False):
         for i, puzzle_func in enumerate(self._puzzle_funcs):
             func_name = puzzle_func.__qualname__
 
-            if func_name in self.solutions and self.solutions[func_name]["correct"]:
-                print(
-                    f"{func_name} already ran successfully: {self.solutions[func_name]['timestamp']}"
-                )
+            solved = self._solved(i + 1)
+            if solved is not None:
+                print(f"{func_name} already ran successfully: {solved['timestamp']}")
                 continue
 
-            if (
-                i > 0
-                and not self.solutions[self._puzzle_funcs[i - 1].__qualname__][
-                    "correct"
-                ]
-            ):
+            if i > 0 and self._solved(i) is None:
                 break  # break if previous puzzle is wrong
 
-            self.is_test = True
-            test_results = self._run_puzzle(
-                puzzle_func=puzzle_func, data_generator=self.get_example
-            )
+            real_run = None
+            if not test_only and self.args.concurrent:
+                real_run = IsolatedRun(
+                    self._run_real, puzzle_func, memory_limit=self._memory_limit
+                )
+
+            try:
+                self.is_test = True
+                test_results = self._run_puzzle(
+                    puzzle_func=puzzle_func, data_generator=self.get_example
+                )
+            except BaseException:
+                if real_run is not None:
+                    real_run.cancel()
+                raise
             print(f"TEST {func_name}: {test_results}")
 
+            example_solution = self._example_solutions[i]()
+            if (
+                real_run is not None
+                and example_solution is not None
+                and example_solution != test_results
+            ):
+                real_run.cancel()
+                print(f"RUN {func_name}: cancelled, expected {example_solution}")
+                break
+
             if not test_only:
-                self.is_test = False
-                run_results = self._run_puzzle(
-                    puzzle_func=puzzle_func, data_generator=file_line_generator
-                )
+                try:
+                    if real_run is None:
+                        ((run_results, memory), wall, cpu, memos), _ = self._isolate(
+                            self._run_real, puzzle_func
+                        )
+                    else:
+                        outcome = real_run.wait(self.args.timeout)
+                        if outcome["status"] != OK:
+                            raise PuzzleAborted(outcome)
+                        (run_results, memory), wall, cpu, memos = outcome["result"]
+                except PuzzleAborted as e:
+                    print(f"RUN {func_name}: {e}")
+                    break
+
                 print(f"RUN {func_name}: {run_results}")
+                if memory is not None:
+                    print(f"MEMORY {func_name}: {format_memory(memory)}")
+                if memos:
+                    print(f"MEMO {func_name}: {format_memos(memos)}")
 
                 if (
-                    self._example_solutions[i]() == test_results
+                    example_solution == test_results
                     or input(f"Submit result {run_results}? (y/n)") == "y"
                 ):
                     print("Submitting")
                     correct = self.aoc.submit(i + 1, run_results)
                     print("Correct!" if correct else "Wrong!")
 
-                    self._save(func_name, run_results, correct, test_results)
+                    self._save(
+                        i + 1,
+                        run_results,
+                        correct,
+                        test_results,
+                        wall=wall,
+                        cpu=cpu,
+                        memory=memory,
+                    )
 
-            self.aoc.download_prompt(i + 1)
-            self.aoc.download_examples(i + 1)
+            self._download(i + 1)
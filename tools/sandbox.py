@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import select
+import signal
+import sys
+import time
+from typing import Callable, Optional
+
+OK = "OK"
+TIMEOUT = "TIMEOUT"
+OOM = "OOM"
+ERROR = "ERROR"
+KILLED = "KILLED"
+CANCELLED = "CANCELLED"
+
+# isolated runs fork, which windows can't
+CAN_ISOLATE = hasattr(os, "fork")
+
+
+class PuzzleAborted(Exception):
+    def __init__(self, outcome: dict) -> None:
+        self.outcome = outcome
+
+        message = outcome["status"]
+        if outcome["result"] is not None:
+            message += f": {outcome['result']}"
+        super().__init__(message)
+
+
+def _child(write_fd: int, func: Callable, args: tuple, memory_limit: Optional[int]):
+    status, result = OK, None
+    try:
+        if memory_limit is not None:
+            import resource  # unix only
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+        result = func(*args)
+    except MemoryError:
+        status = OOM
+    except BaseException as e:
+        status, result = ERROR, f"{type(e).__name__}: {e}"
+
+    try:
+        payload = pickle.dumps((status, result))
+    except Exception:
+        payload = pickle.dumps((status, repr(result)))
+
+    with os.fdopen(write_fd, "wb") as f:
+        f.write(payload)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
+
+
+class IsolatedRun:
+    """`func(*args)` running in a forked child limited to `memory_limit` bytes of
+    address space, started as soon as it is created.
+    """
+
+    def __init__(
+        self, func: Callable, *args, memory_limit: Optional[int] = None
+    ) -> None:
+        if not CAN_ISOLATE:
+            raise OSError("Isolated runs need os.fork, which this platform lacks")
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        read_fd, write_fd = os.pipe()
+        self.start = time.perf_counter()
+
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(read_fd)
+            _child(write_fd, func, args, memory_limit)
+
+        os.close(write_fd)
+        self._pipe = os.fdopen(read_fd, "rb")
+        self._outcome: Optional[dict] = None
+
+    def wait(self, timeout: Optional[float] = None) -> dict:
+        """Waits until the child is done or `timeout` seconds after it started"""
+        if self._outcome is not None:
+            return self._outcome
+
+        remaining = None
+        if timeout is not None:
+            remaining = max(0.0, self.start + timeout - time.perf_counter())
+
+        # the child only writes once it is done, so this waits for it to finish
+        ready, _, _ = select.select([self._pipe], [], [], remaining)
+        if not ready:
+            os.kill(self.pid, signal.SIGKILL)
+            return self._reap(None, TIMEOUT)
+
+        return self._reap(self._pipe.read(), None)
+
+    def cancel(self) -> dict:
+        if self._outcome is None:
+            os.kill(self.pid, signal.SIGKILL)
+            self._reap(None, CANCELLED)
+
+        return self._outcome
+
+    def _reap(self, payload: Optional[bytes], missing_status: Optional[str]) -> dict:
+        self._pipe.close()
+        _, wait_status, usage = os.wait4(self.pid, 0)
+        wall = time.perf_counter() - self.start
+
+        if payload is None:
+            status, result = missing_status, None
+        elif payload:
+            status, result = pickle.loads(payload)
+        elif os.WIFSIGNALED(wait_status):
+            # no payload, the child died before it could report back
+            status, result = KILLED, f"signal {os.WTERMSIG(wait_status)}"
+        else:
+            status, result = ERROR, f"exit code {os.WEXITSTATUS(wait_status)}"
+
+        self._outcome = {
+            "status": status,
+            "result": result,
+            "wall": wall,
+            "usage": {
+                "user": usage.ru_utime,
+                "system": usage.ru_stime,
+                # kilobytes on linux, bytes on macos
+                "max_rss": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+            },
+        }
+        return self._outcome
+
+
+def run_isolated(
+    func: Callable,
+    *args,
+    timeout: Optional[float] = None,
+    memory_limit: Optional[int] = None,
+) -> dict:
+    """Runs `func(*args)` in a forked child limited to `timeout` seconds of wall
+    time and `memory_limit` bytes of address space.
+
+    Returns the outcome `status`, the `result` when it is `OK`, and the wall time
+    and resource usage of the child.
+    """
+    return IsolatedRun(func, *args, memory_limit=memory_limit).wait(timeout)
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import sys
+from datetime import datetime
+from functools import cached_property, update_wrapper
+from types import MethodType, ModuleType
+from typing import Any, Callable, Optional
+
+from tools import CACHE_DIR
+
+RESULTS_DB = os.path.join(CACHE_DIR, "results.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    year INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    input_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    solution TEXT,
+    correct INTEGER,
+    test_result TEXT,
+    wall REAL,
+    cpu REAL,
+    memory TEXT,
+    stats TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_solved
+    ON runs (year, day, part, input_hash, correct);
+CREATE INDEX IF NOT EXISTS runs_kind
+    ON runs (year, day, part, kind);
+"""
+
+JSON_COLUMNS = ("solution", "test_result", "memory", "stats")
+
+
+class ResultsStore:
+    """History of every answer, correctness check and timing per puzzle part.
+
+    Backed by sqlite in WAL mode so parallel runners can write concurrently,
+    every record is its own transaction.
+    """
+
+    def __init__(self, path: str = RESULTS_DB) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def _to_dict(self, row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
+            return None
+
+        result = dict(row)
+        for column in JSON_COLUMNS:
+            if result[column] is not None:
+                result[column] = json.loads(result[column])
+        if result["correct"] is not None:
+            result["correct"] = bool(result["correct"])
+
+        return result
+
+    def record(
+        self,
+        year: int,
+        day: int,
+        part: int,
+        input_hash: str,
+        kind: str,
+        solution: Any,
+        correct: Optional[bool] = None,
+        test_result: Any = None,
+        wall: Optional[float] = None,
+        cpu: Optional[float] = None,
+        memory: Optional[dict] = None,
+        stats: Optional[dict] = None,
+        timestamp: Optional[str] = None,
+    ) -> None:
+        values = {
+            "year": year,
+            "day": day,
+            "part": part,
+            "input_hash": input_hash,
+            "kind": kind,
+            "timestamp": timestamp or str(datetime.now()),
+            "solution": solution,
+            "correct": correct,
+            "test_result": test_result,
+            "wall": wall,
+            "cpu": cpu,
+            "memory": memory,
+            "stats": stats,
+        }
+        for column in JSON_COLUMNS:
+            if values[column] is not None:
+                values[column] = json.dumps(values[column], default=str)
+
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO runs ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                tuple(values.values()),
+            )
+
+    def solved(self, year: int, day: int, part: int, input_hash: str) -> Optional[dict]:
+        row = self.connection.execute(
+            "SELECT * FROM runs WHERE year = ? AND day = ? AND part = ? AND input_hash = ? AND correct = 1 "
+            "ORDER BY id DESC LIMIT 1",
+            (year, day, part, input_hash),
+        ).fetchone()
+
+        return self._to_dict(row)
+
+    def latest(
+        self,
+        year: int,
+        day: int,
+        part: int,
+        kind: Optional[str] = None,
+        input_hash: Optional[str] = None,
+    ) -> Optional[dict]:
+        query = "SELECT * FROM runs WHERE year = ? AND day = ? AND part = ?"
+        params = [year, day, part]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        if input_hash is not None:
+            query += " AND input_hash = ?"
+            params.append(input_hash)
+
+        row = self.connection.execute(
+            query + " ORDER BY id DESC LIMIT 1", params
+        ).fetchone()
+
+        return self._to_dict(row)
+
+    def history(self, year: int, day: int, part: int) -> list[dict]:
+        rows = self.connection.execute(
+            "SELECT * FROM runs WHERE year = ? AND day = ? AND part = ? ORDER BY id",
+            (year, day, part),
+        ).fetchall()
+
+        return [self._to_dict(row) for row in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+MEMO_DB = os.path.join(CACHE_DIR, "memo.sqlite3")
+
+MEMO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key TEXT PRIMARY KEY,
+    function TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    value BLOB NOT NULL
+);
+"""
+
+# digest of the input the current puzzle run is working on, set by the runner
+_memo_input_hash: Optional[str] = None
+
+
+def set_memo_input(input_hash: Optional[str]) -> None:
+    """Scopes disk memos to an input, `None` turns them off"""
+    global _memo_input_hash
+    _memo_input_hash = input_hash
+
+
+class MemoStore:
+    """Pickled function results in sqlite, shared by every run on this machine"""
+
+    def __init__(self, path: str = MEMO_DB) -> None:
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # a connection must not cross a fork, isolated puzzle runs open their own
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            with self._connection:
+                self._connection.executescript(MEMO_SCHEMA)
+            self._pid = os.getpid()
+
+        return self._connection
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        row = self.connection.execute(
+            "SELECT value FROM memo WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+
+        return True, pickle.loads(row[0])
+
+    def set(self, key: str, function: str, value: Any) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO memo (key, function, timestamp, value) VALUES (?, ?, ?, ?)",
+                (key, function, str(datetime.now()), pickle.dumps(value)),
+            )
+
+    def clear(self, function: Optional[str] = None) -> None:
+        with self.connection:
+            if function is None:
+                self.connection.execute("DELETE FROM memo")
+            else:
+                self.connection.execute(
+                    "DELETE FROM memo WHERE function = ?", (function,)
+                )
+
+
+MEMO_STORE = MemoStore()
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _project_module(value: Any) -> Optional[ModuleType]:
+    """Module of the repo that defines `value`, or is `value`"""
+    if isinstance(value, ModuleType):
+        module = value
+    else:
+        module = sys.modules.get(getattr(value, "__module__", None) or "")
+
+    path = getattr(module, "__file__", None)
+    if path is None or not os.path.abspath(path).startswith(PROJECT_DIR + os.sep):
+        return None
+
+    return module
+
+
+class DiskMemoized:
+    """Results of `fn` stored on disk, keyed by its qualified name, a hash of the
+    source of its module and the repo modules that one uses, its arguments (or `key(*args, **kwargs)`) and the digest of the input
+    the runner is currently working on. Calls outside of a puzzle run aren't cached.
+    """
+
+    def __init__(
+        self,
+        fn: Callable,
+        key: Optional[Callable] = None,
+        store: MemoStore = MEMO_STORE,
+    ) -> None:
+        update_wrapper(self, fn)
+        self.fn = fn
+        self.key = key
+        self.store = store
+        self.hits = self.misses = 0
+
+    @cached_property
+    def source_hash(self) -> str:
+        # the function may only delegate, e.g. to helpers of its day or to
+        # tools.alg, so editing any code it could reach invalidates its results
+        module = inspect.getmodule(self.fn)
+        modules = {module.__name__: module}
+        for value in vars(module).values():
+            used = _project_module(value)
+            if used is not None:
+                modules.setdefault(used.__name__, used)
+
+        source_hash = hashlib.sha256()
+        for name in sorted(modules):
+            source_hash.update(inspect.getsource(modules[name]).encode())
+
+        return source_hash.hexdigest()
+
+    def _key(self, args: tuple, kwargs: dict) -> str:
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+        else:
+            key = (args, sorted(kwargs.items()))
+
+        return hashlib.sha256(
+            pickle.dumps(
+                (self.__qualname__, self.source_hash, key, _memo_input_hash),
+                protocol=4,
+            )
+        ).hexdigest()
+
+    def __call__(self, *args, **kwargs):
+        if _memo_input_hash is None:
+            return self.fn(*args, **kwargs)
+
+        key = self._key(args, kwargs)
+        found, result = self.store.get(key)
+        if found:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self.fn(*args, **kwargs)
+        self.store.set(key, self.__qualname__, result)
+
+        return result
+
+    def __get__(self, instance: Any, owner: type = None) -> Callable:
+        if instance is None:
+            return self
+
+        return MethodType(self, instance)
+
+
+def disk_memoize(fn: Optional[Callable] = None, *, key: Optional[Callable] = None):
+    """`@disk_memoize`, or `@disk_memoize(key=...)` when the arguments, such as
+    `self`, don't pickle to the same bytes on every run.
+    """
+    if fn is None:
+        return lambda fn: DiskMemoized(fn, key)
+
+    return DiskMemoized(fn, key)
@@ -1,23 +1,34 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import mmap
 import os
 import sys
+from array import array
+from collections import OrderedDict
+from functools import cached_property, update_wrapper
 from pathlib import Path
-from typing import AnyStr, Generator, Optional
+from types import MethodType
+from typing import Any, AnyStr, Callable, Generator, Iterable, List, Optional
 
-from tools import INPUT_FILE_NAME, INPUTS_DIR
+from tools import INPUT_FILE_NAME, INPUTS_DIR, str_to_int_table
+from tools.grid import Grid
 
 
-def file_line_generator(
-    file_path=None, file_name=None, *, path: str = None
-) -> Generator[AnyStr, None, None]:
+def get_input_path(file_path=None, file_name=None) -> str:
     if file_path is None:
         file_path = sys.argv[0]
 
     if file_name is None:
         file_name = INPUT_FILE_NAME
 
+    return os.path.join(INPUTS_DIR, Path(file_path).stem, file_name)
+
+
+def file_line_generator(
+    file_path=None, file_name=None, *, path: str = None
+) -> Generator[AnyStr, None, None]:
     if path is None:
-        path = os.path.join(INPUTS_DIR, Path(file_path).stem, file_name)
+        path = get_input_path(file_path, file_name)
 
     if not os.path.exists(path):
         raise FileNotFoundError
@@ -27,8 +38,191 @@ def file_line_generator(
             yield line.rstrip("\r\n")
 
 
+class MappedInput:
+    """Read-only memory map of an input file with an index of line offsets.
+
+    Lines come back as memoryview slices of the map, without the line ending,
+    so nothing is decoded or copied until the caller asks for it. Views handed
+    out must be released before `close`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.size = os.path.getsize(path)
+
+        with open(path, "rb") as f:
+            # an empty file can't be mapped
+            self.mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+            )
+
+        self.buffer = memoryview(self.mmap)
+
+    @staticmethod
+    def from_file(file_path=None, file_name=None, *, path: str = None) -> "MappedInput":
+        if path is None:
+            path = get_input_path(file_path, file_name)
+
+        if not os.path.exists(path):
+            raise FileNotFoundError
+
+        return MappedInput(path)
+
+    @cached_property
+    def offsets(self) -> array:
+        """Start offset of every line, plus one past the end of the last line"""
+        offsets = array("q", [0])
+        find = self.mmap.find
+
+        pos = find(b"\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+
+        if offsets[-1] != self.size:
+            offsets.append(self.size + 1)  # no trailing newline
+
+        return offsets
+
+    def line(self, index: int) -> memoryview:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+
+        start, end = self.offsets[index], self.offsets[index + 1] - 1
+        if end > start and self.buffer[end - 1] == 13:  # \r
+            end -= 1
+
+        return self.buffer[start:end]
+
+    def count(self, sub: bytes) -> int:
+        count = 0
+        find = self.mmap.find
+
+        pos = find(sub)
+        while pos != -1:
+            count += 1
+            pos = find(sub, pos + max(1, len(sub)))
+
+        return count
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> memoryview:
+        return self.line(index)
+
+    def __iter__(self):
+        return (self.line(i) for i in range(len(self)))
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self.size:
+            self.mmap.close()
+
+    def __enter__(self) -> "MappedInput":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PuzzleInput:
+    """Puzzle data shared by both parts, every view is built once on first use.
+
+    Iterating, indexing and `len` all go through `lines`, so it can be used
+    anywhere a list of lines was. The views are cached, treat them as read-only.
+    `mapped` gives zero-copy access to the input file itself.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        lines: Optional[Iterable[str]] = None,
+        parser: Optional[Callable[["PuzzleInput"], Any]] = None,
+    ) -> None:
+        self.path = path
+        self._lines = lines
+        self.parser = parser
+
+    @staticmethod
+    def from_file(
+        file_path=None, file_name=None, *, path: str = None, parser: Callable = None
+    ) -> "PuzzleInput":
+        if path is None:
+            path = get_input_path(file_path, file_name)
+
+        if not os.path.exists(path):
+            raise FileNotFoundError
+
+        return PuzzleInput(path=path, parser=parser)
+
+    @cached_property
+    def raw(self) -> bytes:
+        if self.path is None:
+            return "\n".join(self.lines).encode()
+
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    @cached_property
+    def mapped(self) -> MappedInput:
+        if self.path is None:
+            raise FileNotFoundError
+
+        return MappedInput(self.path)
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self.raw).hexdigest()
+
+    @cached_property
+    def text(self) -> str:
+        return self.raw.decode()
+
+    @cached_property
+    def lines(self) -> List[str]:
+        if self._lines is not None:
+            return list(self._lines)
+
+        lines = self.text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+
+        return [line.rstrip("\r") for line in lines]
+
+    @cached_property
+    def int_rows(self) -> List[array]:
+        return str_to_int_table(self.text, numpy=False)
+
+    def int_table(self, width: Optional[int] = None) -> Any:
+        """`str_to_int_table` of the whole input, NumPy backed when available"""
+        return str_to_int_table(self.text, width)
+
+    @cached_property
+    def grid(self) -> Grid:
+        return Grid.from_lines(self.lines)
+
+    @cached_property
+    def parsed(self) -> Any:
+        if self.parser is None:
+            raise NotImplementedError
+
+        return self.parser(self)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, index):
+        return self.lines[index]
+
+
 class Singleton:
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if not hasattr(cls, "instance"):
             cls.instance = super(Singleton, cls).__new__(cls)
         return cls.instance
@@ -56,15 +250,104 @@ def extract_year_from_path(file_path: Optional[str] = None) -> int:
     return int(filename)
 
 
-def memoize(fn):
-    memo = {}
+# every memoized function, so runners can reset and report them per run
+MEMOIZED: list["Memoized"] = []
+
 
-    def memoized(*args):
-        if args in memo:
-            return memo[args]
+class Memoized:
+    """Cache of `fn` results keyed by its arguments, or by `key(*args, **kwargs)`
+    when hashing the arguments is expensive. Bounded to the `maxsize` most
+    recently used entries when set.
+    """
+
+    def __init__(
+        self,
+        fn: Callable,
+        maxsize: Optional[int] = None,
+        key: Optional[Callable] = None,
+    ) -> None:
+        update_wrapper(self, fn)
+        self.fn = fn
+        self.maxsize = maxsize
+        self.key = key
+
+        self.cache: OrderedDict = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+        MEMOIZED.append(self)
+
+    def __call__(self, *args, **kwargs):
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+        elif kwargs:
+            key = (args, tuple(sorted(kwargs.items())))
+        else:
+            key = args
+
+        try:
+            _, result = self.cache[key]
+        except KeyError:
+            pass
         else:
-            result = fn(*args)
-            memo[args] = result
+            self.hits += 1
+            if self.maxsize is not None:
+                self.cache.move_to_end(key)
             return result
 
-    return memoized
+        self.misses += 1
+        result = self.fn(*args, **kwargs)
+
+        # the arguments live as long as their entry, so a key built from id() can't
+        # be reused by a new object while it is cached
+        self.cache[key] = (args, result)
+        if self.maxsize is not None and len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+        return result
+
+    def __get__(self, instance: Any, owner: type = None) -> Callable:
+        if instance is None:
+            return self
+
+        return MethodType(self, instance)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.cache),
+            "maxsize": self.maxsize,
+        }
+
+    def reset(self) -> None:
+        self.cache.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+def memoize(
+    fn: Optional[Callable] = None,
+    *,
+    maxsize: Optional[int] = None,
+    key: Optional[Callable] = None,
+):
+    """`@memoize`, or `@memoize(maxsize=..., key=...)` for a bounded or custom keyed cache"""
+    if fn is None:
+        return lambda fn: Memoized(fn, maxsize, key)
+
+    return Memoized(fn, maxsize, key)
+
+
+def memo_stats() -> dict[str, dict]:
+    """Stats of every memoized function called since the last reset"""
+    return {
+        memoized.__qualname__: memoized.stats()
+        for memoized in MEMOIZED
+        if memoized.hits or memoized.misses
+    }
+
+
+def reset_memos() -> None:
+    for memoized in MEMOIZED:
+        memoized.reset()
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import json
 import os
+import random
 import re
+import sqlite3
+import threading
 import time
 from functools import lru_cache
 from typing import Optional, Union
@@ -9,67 +13,211 @@ from typing import Optional, Union
 import markdownify
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 from tools import CACHE_DIR, INPUT_FILE_NAME, INPUTS_DIR
 from tools.config import get_configuration
 from tools.utils import Singleton
 
+AOC_URL = "https://adventofcode.com"
+
+
+# shared by every checkout and process on the host, the limit is per person
+REQUESTS_DB = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "adventofcode",
+    "requests.sqlite3",
+)
+LEGACY_REQUESTS_FILE = os.path.join(CACHE_DIR, "requests.json")
+
 
 class RequestLimiter(Singleton):
-    """Be kind, and don't spam adventofcode.com"""
+    """Be kind, and don't spam adventofcode.com
+
+    The last request time per URL lives in sqlite, and every send slot is
+    reserved in an exclusive transaction, so the spacing holds across all
+    processes and threads on the host.
+    """
 
     GENERAL_RATE_SEC = 1
     GET_RATE_SEC = 10
     POST_RATE_SEC = 60
 
-    def __init__(self) -> None:
+    def __init__(self, path: str = REQUESTS_DB) -> None:
+        if hasattr(self, "connection"):
+            return  # the shared instance is already connected
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # autocommit, transactions are opened explicitly in _reserve
+        self.connection = sqlite3.connect(
+            path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS requests (url TEXT PRIMARY KEY, time REAL NOT NULL)"
+        )
+        self._import_legacy_requests()
+
+        # scales every wait, only meant for stand-in servers
+        self.rate_scale = 1.0
+        self._lock = threading.Lock()
+
+    def _import_legacy_requests(self) -> None:
         try:
-            with open(os.path.join(CACHE_DIR, "requests.json"), "r") as f:
-                self.requests = json.load(f)
+            with open(LEGACY_REQUESTS_FILE, "r") as f:
+                legacy = json.load(f)
         except FileNotFoundError:
-            self.requests = {}
+            return
 
-        self.last_request_time = 0
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO requests (url, time) VALUES (?, ?)", legacy.items()
+        )
 
-    def _save(self) -> None:
-        with open(os.path.join(CACHE_DIR, "requests.json"), "w") as f:
-            json.dump(self.requests, f)
+    def _reserve(self, url: str, max_wait: int) -> float:
+        # BEGIN IMMEDIATE takes the database write lock up front, so no other
+        # process can read the same last request times until this slot is stored
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            last_request_time, url_time = self.connection.execute(
+                "SELECT MAX(time), MAX(CASE WHEN url = ? THEN time END) FROM requests",
+                (url,),
+            ).fetchone()
+
+            send_time = max(
+                time.time(),
+                (last_request_time or 0) + self.GENERAL_RATE_SEC * self.rate_scale,
+            )
+            if url_time is not None:
+                send_time = max(send_time, url_time + max_wait * self.rate_scale)
 
-    def _wait(self, url: str, max_wait: int):
-        now = time.time()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO requests (url, time) VALUES (?, ?)",
+                (url, send_time),
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
 
-        if url in self.requests:
-            time.sleep(max(0, max_wait - (now - self.requests[url])))
-        else:
-            time.sleep(max(0, self.GENERAL_RATE_SEC - (now - self.last_request_time)))
+        return send_time
 
-        self.requests[url] = time.time()
-        self.last_request_time = time.time()
+    def _wait(self, url: str, max_wait: int):
+        # reserve the next free slot under the lock, then sleep outside of it so
+        # concurrent callers queue up behind each other instead of all firing at once
+        with self._lock:
+            send_time = self._reserve(url, max_wait)
 
-        self._save()
+        time.sleep(max(0, send_time - time.time()))
 
-    def get(self, url, **kwargs):
+    def get(self, url, session: Optional[requests.Session] = None, **kwargs):
         self._wait(url, self.GET_RATE_SEC)
-        return requests.get(url, **kwargs)
+        return (session or requests).get(url, **kwargs)
 
-    def post(self, url, **kwargs):
+    def post(self, url, session: Optional[requests.Session] = None, **kwargs):
         self._wait(url, self.POST_RATE_SEC)
-        return requests.post(url, **kwargs)
+        return (session or requests).post(url, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """Keep-alive connection pool shared by every AOCWebInterface in the process"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def request_not_sent(error: requests.RequestException) -> bool:
+    """Whether the request failed while connecting, before any of it was sent"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    # requests wraps urllib3's MaxRetryError, whose reason is the actual failure
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+EXAMPLE_INTRO = re.compile("(?:f|F)or (?:example|example:)", re.IGNORECASE)
+
+
+def parse_articles(html: Union[str, bytes]) -> list[dict]:
+    """Single parse of a day page into each article's html, markdown and example
+    blocks, with their position among the article's `<pre>` blocks.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    articles = []
+    for article in soup.findAll("article"):
+        pres = article.findAll("pre")
+
+        examples = []
+        for intro in article.findAll("p", text=EXAMPLE_INTRO):
+            pre = intro.find_next_sibling("pre")
+            if pre is None or pre.code is None:
+                continue
+
+            examples.append(
+                {
+                    "position": next(i for i, other in enumerate(pres) if other is pre),
+                    "text": pre.code.text.strip(),
+                }
+            )
+
+        articles.append(
+            {
+                "html": str(article),
+                "markdown": markdownify.markdownify(
+                    str(article), heading_style="ATX"
+                ).strip(),
+                "examples": examples,
+            }
+        )
+
+    return articles
+
+
+def article_hash(article: dict) -> str:
+    return hashlib.sha256(article["html"].encode()).hexdigest()
 
 
 class AOCWebInterface:
     """Interfaces with AOC"""
 
-    def __init__(self, year: int, day: int) -> None:
+    TIMEOUT_SEC = 30
+    MAX_ATTEMPTS = 4
+    BACKOFF_BASE_SEC = 2
+    BACKOFF_MAX_SEC = 60
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        year: int,
+        day: int,
+        year_dir: Optional[str] = None,
+        base_url: str = AOC_URL,
+    ) -> None:
         self.year = year
         self.day = day
         self.day_str = f"day_{day:02d}"
+        self.base_url = base_url.rstrip("/")
         self.request_limit = RequestLimiter()
+        self.session = get_session()
+
+        if year_dir is None:
+            self.inputs_dir, self.cache_dir = INPUTS_DIR, CACHE_DIR
+        else:
+            self.inputs_dir = os.path.join(year_dir, "inputs")
+            self.cache_dir = os.path.join(year_dir, ".cache")
 
         config = get_configuration()
         cookies = {}
-        for key, value in config.items("requests.cookies"):
-            cookies[key] = value
+        # stand-in servers don't need the session cookie
+        if config.has_section("requests.cookies"):
+            for key, value in config.items("requests.cookies"):
+                cookies[key] = value
 
         headers = {
             "User-Agent": "github.com/mattstruble/adventofcode by twitter.com/mestruble"
@@ -77,88 +225,179 @@ class AOCWebInterface:
 
         self.request_kwargs = {"cookies": cookies, "headers": headers}
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends through the rate limiter, retrying connection errors and transient
+        statuses with jittered exponential backoff. A POST is only retried when it
+        failed to connect, as one that reached the server may have been applied,
+        and a submitted answer counts even when the response is lost.
+
+        Error statuses left after the retries raise `requests.HTTPError`.
+        """
+        retry_sent = method == "GET"
+        send = self.request_limit.get if retry_sent else self.request_limit.post
+        kwargs = {**self.request_kwargs, "timeout": self.TIMEOUT_SEC, **kwargs}
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            last_attempt = attempt == self.MAX_ATTEMPTS - 1
+            try:
+                response = send(url, session=self.session, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt or not (retry_sent or request_not_sent(e)):
+                    raise
+            else:
+                retry = retry_sent and response.status_code in self.RETRY_STATUSES
+                if not retry or last_attempt:
+                    response.raise_for_status()
+                    return response
+
+            backoff = min(self.BACKOFF_MAX_SEC, self.BACKOFF_BASE_SEC * 2**attempt)
+            time.sleep(random.uniform(backoff / 2, backoff))
+
+    def _get_conditional(self, url: str, validators: dict) -> requests.Response:
+        headers = dict(self.request_kwargs["headers"])
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        return self._request("GET", url, headers=headers)
+
     def download_input(self, path: Optional[str] = None) -> None:
         if path is None:
-            path = os.path.join(INPUTS_DIR, self.day_str, INPUT_FILE_NAME)
+            path = os.path.join(self.inputs_dir, self.day_str, INPUT_FILE_NAME)
 
         if os.path.exists(path):
             return
 
-        url = f"https://adventofcode.com/{self.year}/day/{self.day}/input"
+        url = f"{self.base_url}/{self.year}/day/{self.day}/input"
 
-        response = self.request_limit.get(url, **self.request_kwargs)
+        response = self._request("GET", url)
 
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
         with open(path, "wb") as f:
             f.write(response.content)
 
-    @lru_cache()
-    def _get_day_article(self, puzzle_num=1) -> str:
-        cache_fname = os.path.join(CACHE_DIR, f"{self.day_str}.html")
+    @property
+    def article_cache_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.day_str}.json")
+
+    @property
+    def legacy_article_cache_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.day_str}.html")
 
-        if os.path.exists(cache_fname):
-            with open(cache_fname, "r") as f:
+    def _load_article_cache(self) -> Optional[dict]:
+        try:
+            with open(self.article_cache_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        # html cached before articles were stored parsed, converted once
+        try:
+            with open(self.legacy_article_cache_path, "r") as f:
                 html = f.read()
+        except FileNotFoundError:
+            return None
 
-            # If we have both articles early return
-            soup = BeautifulSoup(html, "html.parser")
-            if len(soup.findAll("article")) >= puzzle_num:
-                return html
+        cache = {"validators": {}, "articles": parse_articles(html)}
+        self._save_article_cache(cache)
+        return cache
 
-        url = f"https://adventofcode.com/{self.year}/day/{self.day}"
+    def _save_article_cache(self, cache: dict) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.article_cache_path, "w") as f:
+            json.dump(cache, f)
 
-        response = self.request_limit.get(url, **self.request_kwargs)
+    @lru_cache()
+    def _get_day_articles(self, puzzle_num=1) -> list[dict]:
+        cache = self._load_article_cache()
+
+        # If we have both articles early return
+        if cache is not None and len(cache["articles"]) >= puzzle_num:
+            return cache["articles"]
+
+        url = f"{self.base_url}/{self.year}/day/{self.day}"
+
+        # only revalidate when there's a cached article the validators belong to
+        response = self._get_conditional(url, cache["validators"] if cache else {})
+        if response.status_code == 304:
+            return cache["articles"]
+
+        cache = {
+            "validators": {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+            "articles": parse_articles(response.content),
+        }
+        self._save_article_cache(cache)
 
-        soup = BeautifulSoup(response.content, "html.parser")
-        article = "".join([str(article) for article in soup.findAll("article")])
+        return cache["articles"]
 
-        with open(cache_fname, "w") as f:
-            f.write(article)
+    def _build(self, path: str, source_hash: str, content: str) -> bool:
+        """Make-style rebuild of a file derived from the articles, only written when
+        it is missing or was built from a different `source_hash`.
+        """
+        cache = self._load_article_cache()
+        built = cache.setdefault("built", {})
+        key = os.path.abspath(path)
 
-        return article
+        if os.path.exists(path) and built.get(key, source_hash) == source_hash:
+            # files from before the build records are kept, and adopted as up to date
+            if key not in built:
+                built[key] = source_hash
+                self._save_article_cache(cache)
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+        built[key] = source_hash
+        self._save_article_cache(cache)
+        return True
 
     def download_prompt(self, puzzle_num: int = 1, path: Optional[str] = None) -> None:
         if path is None:
-            path = os.path.join(INPUTS_DIR, self.day_str, "README.md")
+            path = os.path.join(self.inputs_dir, self.day_str, "README.md")
 
-        article = self._get_day_article(puzzle_num)
+        articles = self._get_day_articles(puzzle_num)
 
-        with open(path, "w") as f:
-            f.write(markdownify.markdownify(str(article), heading_style="ATX"))
+        source_hash = hashlib.sha256(
+            "".join(article_hash(article) for article in articles).encode()
+        ).hexdigest()
+        self._build(
+            path,
+            source_hash,
+            "\n\n".join(article["markdown"] for article in articles),
+        )
 
     def download_examples(
         self, puzzle_num: int = 1, path: Optional[str] = None
     ) -> None:
         if path is None:
-            path = os.path.join(INPUTS_DIR, self.day_str)
-
-        article = self._get_day_article(puzzle_num)
+            path = os.path.join(self.inputs_dir, self.day_str)
 
-        soup = BeautifulSoup(article, "html.parser")
-        articles = soup.findAll("article")
+        articles = self._get_day_articles(puzzle_num)
 
         for i, article in enumerate(articles):
-            if os.path.exists(os.path.join(path, f"EXAMPLE_{i+1}.txt")):
+            if not article["examples"]:
                 continue
 
-            examples = article.findAll(
-                "p", text=re.compile("(?:f|F)or (?:example|example:)", re.IGNORECASE)
+            # the last "For example" block of a part is the one its answer is given for
+            self._build(
+                os.path.join(path, f"EXAMPLE_{i+1}.txt"),
+                article_hash(article),
+                article["examples"][-1]["text"],
             )
-            for example in examples:
-                try:
-                    pre = example.find_next_sibling("pre")
-                    with open(os.path.join(path, f"EXAMPLE_{i+1}.txt"), "w") as f:
-                        f.write(str(pre.code.text.strip()))
-                except Exception as e:
-                    print(e)
 
     def submit(self, puzzle_num: int, solution: Union[str, int, float]) -> bool:
         data = {"level": puzzle_num, "answer": solution}
 
-        url = f"https://adventofcode.com/{self.year}/day/{self.day}/answer"
+        url = f"{self.base_url}/{self.year}/day/{self.day}/answer"
 
-        response = self.request_limit.post(url, data=data, **self.request_kwargs)
+        response = self._request("POST", url, data=data)
 
         soup = BeautifulSoup(response.content, "html.parser")
         article = soup.find("article")